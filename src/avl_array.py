@@ -0,0 +1,291 @@
+import sys
+from array import array
+
+from avl_layout import FrozenAVLTree, descend_batch, import_numpy
+from avl_tree import AVLTree
+from replacement import set_replacement
+
+
+class ArrayAVLTree:
+    """AVL tree stored as parallel typed arrays (struct-of-arrays) instead of Node objects.
+
+    Slot 0 is the empty sentinel (height 0), so a child index of 0 means "no child".
+    Keys must fit in a signed 64-bit integer. Deleted slots are chained into a
+    free-list through the `left` array and reused by later inserts.
+    """
+
+    def __init__(self, mode='standard'):
+        if mode not in ['standard', 'optimized']:
+            raise ValueError("Mode must be 'standard' or 'optimized'")
+        self.mode = mode
+        self.keys = array('q', [0])
+        self.left = array('i', [0])
+        self.right = array('i', [0])
+        self.heights = array('b', [0])
+        self.root = 0
+        self._free = 0
+        self._path = []
+        self._version = 0
+        self._frozen = None
+        self._frozen_version = 0
+        self._flat = None
+        self._flat_version = 0
+        self.stats = {'rotations': 0, 'comparisons': 0}
+
+    @classmethod
+    def from_sorted(cls, iterable, mode='standard'):
+        """Builds a height-balanced tree in O(n) without rotations. Unsorted input is sorted first."""
+        keys = list(iterable)
+        if any(keys[i] > keys[i + 1] for i in range(len(keys) - 1)): keys.sort()
+        n = len(keys)
+        tree = cls(mode)
+        tree.keys = array('q', [0]) + array('q', keys)
+        tree.left = array('i', bytes(4 * (n + 1)))
+        tree.right = array('i', bytes(4 * (n + 1)))
+        tree.heights = array('b', bytes(n + 1))
+        tree.root = tree._build_balanced(1, n + 1)
+        return tree
+
+    def _build_balanced(self, lo, hi):
+        """Links slots lo..hi-1 (already in key order) into a subtree rooted at the middle slot."""
+        if lo >= hi: return 0
+        mid = (lo + hi) // 2
+        self.left[mid] = self._build_balanced(lo, mid)
+        self.right[mid] = self._build_balanced(mid + 1, hi)
+        self.heights[mid] = 1 + max(self.heights[self.left[mid]], self.heights[self.right[mid]])
+        return mid
+
+    def reset_stats(self):
+        self.stats = {'rotations': 0, 'comparisons': 0}
+
+    def get_height(self, node):
+        return self.heights[node]
+
+    def get_balance(self, node):
+        if not node: return 0
+        return self.heights[self.left[node]] - self.heights[self.right[node]]
+
+    def _children(self, node):
+        return self.left[node], self.right[node]
+
+    def use_replacement(self, strategy=None):
+        """Hands the two-child deletion choice to a strategy from replacement.py (see AVLTree.use_replacement)."""
+        return set_replacement(self, strategy)
+
+    def _new_node(self, key):
+        i = self._free
+        if i:
+            self._free = self.left[i]
+            self.keys[i] = key
+            self.left[i] = 0
+            self.right[i] = 0
+            self.heights[i] = 1
+            return i
+        self.keys.append(key)
+        self.left.append(0)
+        self.right.append(0)
+        self.heights.append(1)
+        return len(self.keys) - 1
+
+    def _free_node(self, i):
+        self.left[i] = self._free
+        self.right[i] = 0
+        self.heights[i] = 0
+        self._free = i
+
+    def _get_min_node(self, node):
+        left = self.left
+        while left[node]: node = left[node]
+        return node
+
+    def _get_max_node(self, node):
+        right = self.right
+        while right[node]: node = right[node]
+        return node
+
+    def _rotate_right(self, z):
+        self.stats['rotations'] += 1
+        left, right, heights = self.left, self.right, self.heights
+        y = left[z]
+        left[z] = right[y]
+        right[y] = z
+        heights[z] = 1 + max(heights[left[z]], heights[right[z]])
+        heights[y] = 1 + max(heights[left[y]], heights[right[y]])
+        return y
+
+    def _rotate_left(self, z):
+        self.stats['rotations'] += 1
+        left, right, heights = self.left, self.right, self.heights
+        y = right[z]
+        right[z] = left[y]
+        left[y] = z
+        heights[z] = 1 + max(heights[left[z]], heights[right[z]])
+        heights[y] = 1 + max(heights[left[y]], heights[right[y]])
+        return y
+
+    def insert(self, key):
+        keys, left, right = self.keys, self.left, self.right
+        path = self._path
+        path.clear()
+        node = self.root
+        while node:
+            path.append(node)
+            if key < keys[node]: node = left[node]
+            else: node = right[node]
+        self.stats['comparisons'] += len(path)
+
+        new = self._new_node(key)
+        self._version += 1
+        if not path:
+            self.root = new
+            return
+        parent = path[-1]
+        if key < keys[parent]: left[parent] = new
+        else: right[parent] = new
+        self._retrace(path, len(path) - 1)
+
+    def delete(self, key):
+        """Deletes one occurrence of key; returns whether it was present."""
+        keys, left, right = self.keys, self.left, self.right
+        path = self._path
+        path.clear()
+        node = self.root
+        while node:
+            path.append(node)
+            k = keys[node]
+            if key < k: node = left[node]
+            elif key > k: node = right[node]
+            else: break
+        else:
+            self.stats['comparisons'] += len(path)
+            return False
+
+        if left[node] and right[node]:
+            if self._choose_replacement(node) == 'left':
+                current = left[node]
+                while current:
+                    path.append(current)
+                    current = right[current]
+            else:
+                current = right[node]
+                while current:
+                    path.append(current)
+                    current = left[current]
+            keys[node] = keys[path[-1]]
+        self.stats['comparisons'] += len(path)
+
+        removed = path.pop()
+        self._version += 1
+        child = left[removed] if left[removed] else right[removed]
+        if not path: self.root = child
+        elif left[path[-1]] == removed: left[path[-1]] = child
+        else: right[path[-1]] = child
+        self._free_node(removed)
+        self._retrace(path, len(path) - 1)
+        return True
+
+    def _choose_replacement(self, node):
+        if self.mode == 'optimized':
+            if self.heights[self.left[node]] > self.heights[self.right[node]]:
+                return 'left'
+        return 'right'
+
+    def _retrace(self, path, i):
+        left, right, heights = self.left, self.right, self.heights
+        while i >= 0:
+            node = path[i]
+            old_height = heights[node]
+            left_height = heights[left[node]]
+            right_height = heights[right[node]]
+            balance = left_height - right_height
+
+            if balance > 1:
+                if self.get_balance(left[node]) < 0: left[node] = self._rotate_left(left[node])
+                sub = self._rotate_right(node)
+            elif balance < -1:
+                if self.get_balance(right[node]) > 0: right[node] = self._rotate_right(right[node])
+                sub = self._rotate_left(node)
+            else:
+                heights[node] = 1 + (left_height if left_height > right_height else right_height)
+                if heights[node] == old_height: return
+                i -= 1
+                continue
+
+            if i == 0: self.root = sub
+            elif left[path[i - 1]] == node: left[path[i - 1]] = sub
+            else: right[path[i - 1]] = sub
+            if heights[sub] == old_height: return
+            i -= 1
+
+    def search(self, key):
+        keys, left, right = self.keys, self.left, self.right
+        current = self.root
+        while current:
+            k = keys[current]
+            if key == k:
+                return True
+            elif key < k:
+                current = left[current]
+            else:
+                current = right[current]
+        return False
+
+    def __iter__(self):
+        keys, left, right = self.keys, self.left, self.right
+        stack = []
+        node = self.root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = left[node]
+            node = stack.pop()
+            yield keys[node]
+            node = right[node]
+
+    def freeze(self):
+        """Returns a cached FrozenAVLTree of the current keys, rebuilt only after a modification."""
+        if self._frozen is None or self._frozen_version != self._version:
+            self._frozen = FrozenAVLTree(self)
+            self._frozen_version = self._version
+        return self._frozen
+
+    def _flatten(self):
+        """Returns NumPy copies of the keys/left/right arrays, cached until the next change."""
+        if self._flat is None or self._flat_version != self._version:
+            np = import_numpy()
+            # copies, so the typed arrays stay resizable
+            self._flat = tuple(np.frombuffer(a, dtype=t).copy() for a, t in
+                               ((self.keys, np.int64), (self.left, np.int32), (self.right, np.int32)))
+            self._flat_version = self._version
+        return self._flat
+
+    def search_batch(self, keys, details=False):
+        """Vectorized search over the node arrays themselves; same results as AVLTree.search_batch.
+
+        positions are slot indices into the node arrays. Needs NumPy.
+        """
+        flat_keys, left, right = self._flatten()
+        result = descend_batch(flat_keys, left, right, self.root, keys, nil=0)
+        return result if details else result[0]
+
+    def get_average_depth(self):
+        """Returns the average depth of nodes in the tree."""
+        if not self.root: return 0
+        left, right = self.left, self.right
+        n = 0
+        total_path_length = 0
+        stack = [(self.root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            n += 1
+            total_path_length += depth
+            if left[node]: stack.append((left[node], depth + 1))
+            if right[node]: stack.append((right[node], depth + 1))
+        return total_path_length / n
+
+    def get_memory_footprint(self):
+        """Returns the bytes held by the node arrays, including free and sentinel slots."""
+        return sum(sys.getsizeof(a) for a in (self.keys, self.left, self.right, self.heights))
+
+
+BACKENDS = {'object': AVLTree, 'array': ArrayAVLTree}
@@ -0,0 +1,116 @@
+from bisect import bisect_left
+
+
+def import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("batch search needs NumPy (pip install numpy)") from None
+    return numpy
+
+
+def eytzinger(keys):
+    """Returns sorted keys rearranged in Eytzinger (BFS) order, 1-based: slot i has children 2i and 2i+1."""
+    n = len(keys)
+    layout = [None] * (n + 1)
+    stack = []
+    i = 1
+    k = 0
+    while stack or i <= n:
+        while i <= n:
+            stack.append(i)
+            i *= 2
+        i = stack.pop()
+        layout[i] = keys[k]
+        k += 1
+        i = 2 * i + 1
+    return layout
+
+
+class FrozenAVLTree:
+    """Immutable snapshot of a tree's keys in flat, contiguous layouts.
+
+    Single lookups binary-search the sorted key list with bisect, which runs the
+    whole descent in C instead of chasing Node attributes. Batches go through
+    contains_many(), which builds (once) an Eytzinger-ordered NumPy array and
+    advances every query one level per vectorized step; the top levels of that
+    layout share a few cache lines, so the gathers stay local.
+    """
+
+    def __init__(self, keys):
+        """keys must be in sorted order (duplicates allowed)."""
+        self._keys = list(keys)
+        self._layout = None
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def search(self, key):
+        keys = self._keys
+        i = bisect_left(keys, key)
+        return i < len(keys) and keys[i] == key
+
+    def __contains__(self, key):
+        return self.search(key)
+
+    def ceiling(self, key):
+        """Returns the smallest key >= key, or None."""
+        i = bisect_left(self._keys, key)
+        return self._keys[i] if i < len(self._keys) else None
+
+    def contains_many(self, keys):
+        """Vectorized search: returns a NumPy bool array telling which of keys are present."""
+        np = import_numpy()
+        queries = np.asarray(keys)
+        n = len(self._keys)
+        if not n: return np.zeros(len(queries), dtype=bool)
+        if self._layout is None:
+            layout = eytzinger(self._keys)
+            # slot 0 is never a match; fill it with a real key so the array keeps the key dtype
+            layout[0] = layout[1]
+            self._layout = np.array(layout)
+        layout = self._layout
+        i = np.ones(len(queries), dtype=np.int64)
+        for _ in range(n.bit_length()):
+            i = np.where(i <= n, 2 * i + (layout[np.minimum(i, n)] < queries), i)
+        # undo the trailing right turns plus the final left turn to land on the lower bound
+        _, shift = np.frexp((~i & (i + 1)).astype(np.float64))
+        i >>= shift
+        return (i > 0) & (layout[i] == queries)
+
+
+def descend_batch(keys, left, right, root, queries, nil=-1):
+    """Searches every query at once over a tree flattened into NumPy arrays.
+
+    left/right hold child slots (nil = no child). All live queries advance one
+    level per step with vectorized gathers, so the loop runs about height times.
+    Returns (found, positions, depths): positions is the slot of the matching
+    node and depths its depth (root = 0); both are -1 for misses.
+    """
+    np = import_numpy()
+    queries = np.asarray(queries)
+    m = len(queries)
+    found = np.zeros(m, dtype=bool)
+    positions = np.full(m, -1, dtype=np.int64)
+    depths = np.full(m, -1, dtype=np.int64)
+    active = np.arange(m) if root != nil else np.arange(0)
+    node = np.full(len(active), root, dtype=np.int64)
+    level = 0
+    while len(active):
+        k = keys[node]
+        q = queries[active]
+        hit = k == q
+        hits = active[hit]
+        found[hits] = True
+        positions[hits] = node[hit]
+        depths[hits] = level
+        miss = ~hit
+        active, node = active[miss], node[miss]
+        node = np.where(q[miss] < k[miss], left[node], right[node])
+        live = node != nil
+        active, node = active[live], node[live]
+        level += 1
+    return found, positions, depths
@@ -0,0 +1,361 @@
+import sys
+import os
+import struct
+import asyncio
+import argparse
+from itertools import cycle, islice
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from avl_tree import AVLTree
+
+# Wire format (little-endian). Every message is a frame:
+#   request:  request id (uint32), opcode (uint8), payload length (uint32), payload
+#   response: request id (uint32), status (uint8), payload length (uint32), payload
+# Payloads:
+#   GET    key (int64)                    -> value bytes          (NOT_FOUND if absent)
+#   PUT    key (int64), value bytes       -> empty
+#   DELETE key (int64)                    -> empty                (NOT_FOUND if absent)
+#   RANGE  lo, hi (int64), limit (uint32) -> count (uint32), keys (int64 each) in [lo, hi)
+#          lo = INT64_MIN / hi = INT64_MAX leave that bound open, limit 0 = no limit
+#   BATCH  count (uint32), then per item: opcode (uint8), length (uint32), payload
+#          -> count, then per item: status (uint8), length (uint32), payload
+# Values are opaque bytes (a stored None reads back as empty). ERROR payloads carry a UTF-8 message.
+FRAME = struct.Struct('<IBI')
+ITEM = struct.Struct('<BI')
+KEY = struct.Struct('<q')
+RANGE_ARGS = struct.Struct('<qqI')
+COUNT = struct.Struct('<I')
+GET, PUT, DELETE, RANGE, BATCH = 1, 2, 3, 4, 5
+OK, NOT_FOUND, ERROR = 0, 1, 2
+INT64_MIN, INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+_MISSING = object()
+
+
+def parse_frames(buffer):
+    """Splits the complete frames off the front of buffer.
+
+    Returns ([(request id, opcode or status, payload bytes), ...], bytes consumed).
+    """
+    frames = []
+    offset = 0
+    while offset + FRAME.size <= len(buffer):
+        rid, code, length = FRAME.unpack_from(buffer, offset)
+        end = offset + FRAME.size + length
+        if end > len(buffer): break
+        frames.append((rid, code, bytes(buffer[offset + FRAME.size:end])))
+        offset = end
+    return frames, offset
+
+
+def pack_items(items):
+    """Packs [(opcode or status, payload), ...] as a BATCH payload."""
+    return COUNT.pack(len(items)) + b''.join(ITEM.pack(code, len(payload)) + payload for code, payload in items)
+
+
+def unpack_items(payload):
+    (n,), offset = COUNT.unpack_from(payload, 0), COUNT.size
+    items = []
+    for _ in range(n):
+        code, length = ITEM.unpack_from(payload, offset)
+        offset += ITEM.size
+        if offset + length > len(payload): raise ValueError("truncated batch item")
+        items.append((code, payload[offset:offset + length]))
+        offset += length
+    return items
+
+
+def _encode(frames, results):
+    """Encodes the [(status, payload), ...] results of frames as response frames with matching ids."""
+    return b''.join(FRAME.pack(rid, status, len(payload)) + payload for (rid, _, _), (status, payload) in zip(frames, results))
+
+
+def _check(opcode, payload):
+    """Returns why a request is malformed, or None."""
+    if opcode in (GET, DELETE): return None if len(payload) == KEY.size else "GET/DELETE take one int64 key"
+    if opcode == PUT: return None if len(payload) >= KEY.size else "PUT needs an int64 key"
+    if opcode == RANGE: return None if len(payload) == RANGE_ARGS.size else "RANGE takes lo, hi (int64) and limit (uint32)"
+    if opcode == BATCH: return None if len(payload) >= COUNT.size else "BATCH needs an item count"
+    return f"unknown opcode {opcode}"
+
+
+class AVLServer:
+    """Asyncio server that owns one AVLTree and serves it over TCP or a Unix socket.
+
+    Each connection parses every complete frame it has received; the frames of
+    all connections that arrive in the same event-loop iteration are executed
+    together, in arrival order, and consecutive GETs, PUTs or DELETEs are
+    coalesced into one get_many / put_many / delete_many call. The tree is only
+    touched from the event loop, so no locking is needed.
+    """
+
+    def __init__(self, tree=None, mode='standard', **kwargs):
+        self.tree = tree if tree is not None else AVLTree(mode, **kwargs)
+        self.stats = {'requests': 0, 'flushes': 0, 'tree_calls': 0}
+        self._pending = []
+        self._scheduled = False
+        self._server = None
+
+    async def start(self, address):
+        """Listens on a Unix socket path (str) or a (host, port) pair; returns the bound address."""
+        if isinstance(address, str):
+            self._server = await asyncio.start_unix_server(self._handle, address)
+            return address
+        self._server = await asyncio.start_server(self._handle, *address)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        buffer = bytearray()
+        try:
+            while True:
+                data = await reader.read(1 << 16)
+                if not data: break
+                buffer += data
+                frames, consumed = parse_frames(buffer)
+                del buffer[:consumed]
+                if frames:
+                    try:
+                        response = await self._submit(frames)
+                    except Exception as e:
+                        message = f"{type(e).__name__}: {e}".encode()
+                        response = _encode(frames, [(ERROR, message)] * len(frames))
+                    writer.write(response)
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _submit(self, frames):
+        """Queues a connection's frames for the next flush and returns a future of its encoded responses."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((frames, future))
+        if not self._scheduled:
+            self._scheduled = True
+            loop.call_soon(self._flush)
+        return future
+
+    def _flush(self):
+        """Executes every queued frame; if the batch fails, each unresolved future gets the exception."""
+        self._scheduled = False
+        pending, self._pending = self._pending, []
+        try:
+            results = self.execute([(opcode, payload) for frames, _ in pending for _, opcode, payload in frames])
+            self.stats['flushes'] += 1
+            i = 0
+            for frames, future in pending:
+                chunk = results[i:i + len(frames)]
+                i += len(frames)
+                if not future.done(): future.set_result(_encode(frames, chunk))
+        except Exception as e:
+            for _, future in pending:
+                if not future.done(): future.set_exception(e)
+
+    def execute(self, requests):
+        """Runs [(opcode, payload), ...] in order and returns [(status, payload), ...].
+
+        Runs of the same GET/PUT/DELETE opcode become one batched tree call.
+        """
+        results = [None] * len(requests)
+        errors = [_check(opcode, payload) for opcode, payload in requests]
+        i = 0
+        while i < len(requests):
+            opcode = requests[i][0]
+            if errors[i]:
+                results[i] = (ERROR, errors[i].encode())
+                i += 1
+                continue
+            j = i + 1
+            if opcode in (GET, PUT, DELETE):
+                while j < len(requests) and requests[j][0] == opcode and not errors[j]: j += 1
+            try:
+                results[i:j] = self._run(opcode, [payload for _, payload in requests[i:j]])
+            except (ValueError, TypeError, struct.error) as e:
+                results[i:j] = [(ERROR, str(e).encode())] * (j - i)
+            i = j
+        self.stats['requests'] += len(requests)
+        return results
+
+    def _run(self, opcode, payloads):
+        tree = self.tree
+        self.stats['tree_calls'] += 1
+        if opcode == GET:
+            keys = [KEY.unpack_from(p)[0] for p in payloads]
+            values = tree.get_many(keys, _MISSING) if len(keys) > 1 else [tree.get(keys[0], _MISSING)]
+            return [(NOT_FOUND, b'') if v is _MISSING else (OK, v if isinstance(v, bytes) else b'') for v in values]
+        if opcode == PUT:
+            items = [(KEY.unpack_from(p)[0], p[KEY.size:]) for p in payloads]
+            if len(items) > 1: tree.put_many(items)
+            else: tree.put(*items[0])
+            return [(OK, b'')] * len(items)
+        if opcode == DELETE:
+            keys = [KEY.unpack_from(p)[0] for p in payloads]
+            if len(keys) == 1 or len(set(keys)) < len(keys):
+                return [(OK, b'') if tree.delete(key) else (NOT_FOUND, b'') for key in keys]
+            present = tree.search_many(keys)
+            tree.delete_many([key for key, found in zip(keys, present) if found])
+            return [(OK, b'') if found else (NOT_FOUND, b'') for found in present]
+        if opcode == RANGE:
+            lo, hi, limit = RANGE_ARGS.unpack(payloads[0])
+            keys = list(islice(tree.irange(None if lo == INT64_MIN else lo, None if hi == INT64_MAX else hi), limit or None))
+            return [(OK, COUNT.pack(len(keys)) + struct.pack(f'<{len(keys)}q', *keys))]
+        return [(OK, pack_items(self.execute(unpack_items(payloads[0]))))]
+
+
+def encode_request(op, *args):
+    """Encodes ('get', key), ('put', key, value), ('delete', key) or ('range', lo, hi, limit) as (opcode, payload)."""
+    if op == 'get': return GET, KEY.pack(args[0])
+    if op == 'put': return PUT, KEY.pack(args[0]) + (args[1] if len(args) > 1 else b'')
+    if op == 'delete': return DELETE, KEY.pack(args[0])
+    if op == 'range':
+        lo, hi, limit = (tuple(args) + (None, None, 0)[len(args):])
+        return RANGE, RANGE_ARGS.pack(INT64_MIN if lo is None else lo, INT64_MAX if hi is None else hi, limit)
+    raise ValueError(f"unknown operation {op!r}")
+
+
+def decode_result(opcode, status, payload):
+    """Turns a response into get -> bytes or None, put -> None, delete -> bool, range -> list of keys."""
+    if status == ERROR: raise RuntimeError(f"server error: {payload.decode(errors='replace')}")
+    if opcode == GET: return payload if status == OK else None
+    if opcode == DELETE: return status == OK
+    if opcode == RANGE:
+        (n,) = COUNT.unpack_from(payload)
+        return list(struct.unpack_from(f'<{n}q', payload, COUNT.size))
+    return None
+
+
+class _Connection:
+    """One pipelined connection: requests are written without waiting and matched to responses by id."""
+
+    def __init__(self, reader, writer):
+        self.reader, self.writer = reader, writer
+        self.waiting = {}
+        self._next_id = 0
+        self._task = asyncio.ensure_future(self._read_loop())
+
+    async def _read_loop(self):
+        buffer = bytearray()
+        try:
+            while True:
+                data = await self.reader.read(1 << 16)
+                if not data: break
+                buffer += data
+                frames, consumed = parse_frames(buffer)
+                del buffer[:consumed]
+                for rid, status, payload in frames:
+                    future = self.waiting.pop(rid, None)
+                    if future and not future.done(): future.set_result((status, payload))
+        finally:
+            for future in self.waiting.values():
+                if not future.done(): future.set_exception(ConnectionError("connection to the AVL server closed"))
+            self.waiting.clear()
+
+    async def request(self, opcode, payload):
+        rid = self._next_id
+        self._next_id = (rid + 1) & 0xFFFFFFFF
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[rid] = future
+        self.writer.write(FRAME.pack(rid, opcode, len(payload)) + payload)
+        if self.writer.transport.get_write_buffer_size() > 1 << 16: await self.writer.drain()
+        return await future
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        await self._task
+
+
+class AVLClient:
+    """Async client for AVLServer with a pool of pipelined connections.
+
+    Any number of coroutines may issue requests concurrently; each connection
+    keeps all of its requests in flight, so the server sees them pipelined.
+    Single-key requests always travel on the connection picked by the key, so
+    requests for the same key are applied in the order they were issued;
+    ranges and batches go round-robin.
+    """
+
+    def __init__(self, address, pool_size=4):
+        self.address = address
+        self.pool_size = pool_size
+        self._pool = []
+        self._next = None
+
+    async def connect(self):
+        for _ in range(self.pool_size):
+            if isinstance(self.address, str): reader, writer = await asyncio.open_unix_connection(self.address)
+            else: reader, writer = await asyncio.open_connection(*self.address)
+            self._pool.append(_Connection(reader, writer))
+        self._next = cycle(self._pool)
+        return self
+
+    async def close(self):
+        for connection in self._pool: await connection.close()
+        self._pool.clear()
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def call(self, op, *args):
+        opcode, payload = encode_request(op, *args)
+        connection = next(self._next) if opcode == RANGE else self._pool[args[0] % len(self._pool)]
+        status, payload = await connection.request(opcode, payload)
+        return decode_result(opcode, status, payload)
+
+    async def get(self, key):
+        """Returns the value bytes stored for key, or None."""
+        return await self.call('get', key)
+
+    async def put(self, key, value=b''):
+        await self.call('put', key, value)
+
+    async def delete(self, key):
+        return await self.call('delete', key)
+
+    async def range(self, lo=None, hi=None, limit=0):
+        """Returns the keys in [lo, hi), at most limit of them (0 = all)."""
+        return await self.call('range', lo, hi, limit)
+
+    async def batch(self, ops):
+        """Sends [(op, *args), ...] as one BATCH request executed in order; returns their results."""
+        requests = [encode_request(*op) for op in ops]
+        status, payload = await next(self._next).request(BATCH, pack_items(requests))
+        if status == ERROR: raise RuntimeError(f"server error: {payload.decode(errors='replace')}")
+        return [decode_result(opcode, s, p) for (opcode, _), (s, p) in zip(requests, unpack_items(payload))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve one AVLTree over a socket')
+    parser.add_argument('--unix', help='Unix socket path (overrides --host/--port)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7070)
+    parser.add_argument('--mode', choices=['standard', 'optimized'], default='optimized')
+    args = parser.parse_args()
+
+    async def serve():
+        server = AVLServer(mode=args.mode)
+        address = await server.start(args.unix or (args.host, args.port))
+        print(f"AVL server ({args.mode}) listening on {address}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
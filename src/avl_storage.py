@@ -0,0 +1,98 @@
+import sys
+import mmap
+import struct
+
+# File layout (little-endian):
+#   header: magic, format version, mode code, duplicates code, node count
+#   records: one per node in preorder (the root is record 0):
+#            key (int64), left index, right index, height, multiplicity (int32 each; -1 = no child)
+MAGIC = b'AVLT'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHBBq')
+RECORD = struct.Struct('<qiiii')
+MODES = ['standard', 'optimized']
+DUPLICATES = ['allow', 'reject', 'replace', 'count']
+
+
+def read_header(buffer):
+    magic, version, mode, duplicates, n = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC: raise ValueError("not an AVL tree index file")
+    if version != FORMAT_VERSION: raise ValueError(f"unsupported index format version {version}")
+    return MODES[mode], DUPLICATES[duplicates], n
+
+
+class MappedAVLTree:
+    """Read-only AVL index answered straight from a memory-mapped file written by AVLTree.save().
+
+    No Node objects are created: lookups walk the fixed-width records through
+    typed views of the mapping, so opening a large index costs one mmap call.
+    """
+
+    def __init__(self, path):
+        if sys.byteorder != 'little':
+            raise NotImplementedError("MappedAVLTree reads the little-endian layout through native views")
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.mode, self.duplicates, self._n = read_header(self._mmap)
+        view = memoryview(self._mmap)
+        # 8-byte words hold the keys, 4-byte words the links; one record = 3 words = 6 half-words
+        self._words = view[HEADER.size:].cast('q')
+        self._halves = view[HEADER.size:].cast('i')
+
+    def close(self):
+        self._words.release()
+        self._halves.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        """Number of keys iteration yields, as AVLTree's len() (one per stored node)."""
+        return self._n
+
+    def get_height(self):
+        return self._halves[4] if self._n else 0
+
+    def search(self, key):
+        if not self._n: return False
+        words, halves = self._words, self._halves
+        i = 0
+        while i >= 0:
+            k = words[3 * i]
+            if key == k: return True
+            i = halves[6 * i + 2] if key < k else halves[6 * i + 3]
+        return False
+
+    def __contains__(self, key):
+        return self.search(key)
+
+    def irange(self, lo=None, hi=None, reverse=False):
+        """Lazily yields the keys in [lo, hi) in order (or in reverse), like AVLTree.irange."""
+        words, halves = self._words, self._halves
+        stack = []
+        i = 0 if self._n else -1
+        first, second = (2, 3) if not reverse else (3, 2)
+        while i >= 0:
+            k = words[3 * i]
+            if not reverse and lo is not None and k < lo: i = halves[6 * i + 3]
+            elif reverse and hi is not None and not k < hi: i = halves[6 * i + 2]
+            else:
+                stack.append(i)
+                i = halves[6 * i + first]
+        while stack:
+            i = stack.pop()
+            k = words[3 * i]
+            if not reverse and hi is not None and not k < hi: return
+            if reverse and lo is not None and k < lo: return
+            yield k
+            i = halves[6 * i + second]
+            while i >= 0:
+                stack.append(i)
+                i = halves[6 * i + first]
+
+    def __iter__(self):
+        return self.irange()
@@ -1,33 +1,140 @@
-import sys
+import tracemalloc
+from bisect import bisect_left
+from collections.abc import MutableMapping, ItemsView, ValuesView
+from operator import attrgetter
 
-sys.setrecursionlimit(200000)
+from avl_layout import FrozenAVLTree, descend_batch, import_numpy
+from avl_storage import HEADER, RECORD, MAGIC, FORMAT_VERSION, MODES, DUPLICATES, read_header
+from replacement import set_replacement
+
+_MISSING = object()
 
 class Node:
-    def __init__(self, key):
+    __slots__ = ('key', 'value', 'left', 'right', 'height', 'size', 'count')
+
+    def __init__(self, key, value=None):
         self.key = key
+        self.value = value
         self.left = None
         self.right = None
         self.height = 1
+        self.size = 1
+        self.count = 1
+
+def _node_bytes(cls, probes=1000):
+    """Measures the bytes one instance of a node class really takes (sys.getsizeof misses the inline attribute values)."""
+    if cls not in _NODE_BYTES:
+        nodes = [None] * probes
+        tracing = tracemalloc.is_tracing()
+        if not tracing: tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(probes): nodes[i] = cls(0)
+        _NODE_BYTES[cls] = (tracemalloc.get_traced_memory()[0] - before) // probes
+        if not tracing: tracemalloc.stop()
+    return _NODE_BYTES[cls]
+
+_NODE_BYTES = {}
+
+class AVLTree(MutableMapping):
+    """AVL tree that doubles as a sorted MutableMapping (key -> value; plain inserts store None)."""
 
-class AVLTree:
-    def __init__(self, mode='standard'):
+    # Trees compare and hash by identity, as before they became Mappings, so they stay usable in sets and as dict keys
+    __eq__ = object.__eq__
+    __ne__ = object.__ne__
+    __hash__ = object.__hash__
+
+    def __init__(self, mode='standard', order_stats=False, duplicates='allow'):
+        """With order_stats=True every node also tracks its subtree size, enabling rank/select/count_range.
+
+        duplicates sets what insert() does with a key that is already present:
+        'allow' adds another node (the original behaviour), 'reject' ignores it,
+        'replace' overwrites the stored value and 'count' bumps a per-node
+        multiplicity. The last three return without any rebalancing. In
+        'count' mode len() and iteration see each key once; total() and
+        count(key) include the copies.
+        """
         if mode not in ['standard', 'optimized']:
             raise ValueError("Mode must be 'standard' or 'optimized'")
+        if duplicates not in ['allow', 'reject', 'replace', 'count']:
+            raise ValueError("duplicates must be 'allow', 'reject', 'replace' or 'count'")
         self.mode = mode
+        self.order_stats = order_stats
+        self.duplicates = duplicates
         self.root = None
-        self.stats = {'rotations': 0, 'comparisons': 0}
+        self.stats = {'rotations': 0, 'comparisons': 0, 'duplicates': 0}
+        self._path = []
+        self._size = 0
+        self._matched = 0
+        self._decrements = 0
+        self._version = 0
+        self._frozen = None
+        self._frozen_version = 0
+        self._flat = None
+        self._flat_version = 0
+        self._ipl = None
+        self._ipl_version = 0
+        self._shift = 0
+
+    @classmethod
+    def from_sorted(cls, iterable, mode='standard', **kwargs):
+        """Builds a height-balanced tree in O(n) without rotations. Unsorted input is sorted first.
+
+        Extra keyword arguments are passed to the constructor.
+        """
+        keys = list(iterable)
+        if any(keys[i] > keys[i + 1] for i in range(len(keys) - 1)): keys.sort()
+        tree = cls(mode, **kwargs)
+        size = len(keys)
+        counts = None
+        if tree.duplicates != 'allow':
+            keys, counts = _runs(keys)
+            size = len(keys)
+        tree.root = tree._build_balanced(keys, 0, len(keys), counts if tree.duplicates == 'count' else None)
+        tree._size = size
+        return tree
+
+    def _empty_like(self):
+        """Returns an empty tree with the same configuration."""
+        return type(self)(self.mode, order_stats=self.order_stats, duplicates=self.duplicates)
+
+    def _build_balanced(self, keys, lo, hi, counts=None):
+        """Builds a subtree from keys[lo:hi] (sorted) by always rooting at the middle key.
+
+        counts, when given, holds the multiplicity of each key.
+        """
+        if lo >= hi: return None
+        mid = (lo + hi) // 2
+        node = Node(keys[mid])
+        if counts: node.count = counts[mid]
+        node.left = self._build_balanced(keys, lo, mid, counts)
+        node.right = self._build_balanced(keys, mid + 1, hi, counts)
+        node.height = 1 + max(self.get_height(node.left), self.get_height(node.right))
+        node.size = hi - lo
+        return node
 
     def reset_stats(self):
-        self.stats = {'rotations': 0, 'comparisons': 0}
+        self.stats = {'rotations': 0, 'comparisons': 0, 'duplicates': 0}
 
     def get_height(self, node):
         if not node: return 0
         return node.height
 
+    def get_size(self, node):
+        """Returns the number of nodes under node; only maintained when order_stats is enabled."""
+        if not node: return 0
+        return node.size
+
     def get_balance(self, node):
         if not node: return 0
         return self.get_height(node.left) - self.get_height(node.right)
 
+    def _children(self, node):
+        return node.left, node.right
+
+    def _own(self, node):
+        """Returns a version of node that the running operation may modify; PersistentAVLTree copies shared nodes here."""
+        return node
+
     def _get_min_node(self, node):
         current = node
         while current.left: current = current.left
@@ -46,6 +153,10 @@ class AVLTree:
         z.left = T3
         z.height = 1 + max(self.get_height(z.left), self.get_height(z.right))
         y.height = 1 + max(self.get_height(y.left), self.get_height(y.right))
+        if self.order_stats:
+            self._shift += self.get_size(z.right) - self.get_size(y.left)
+            z.size = 1 + self.get_size(z.left) + self.get_size(z.right)
+            y.size = 1 + z.size + self.get_size(y.left)
         return y
 
     def _rotate_left(self, z):
@@ -56,83 +167,516 @@ class AVLTree:
         z.right = T2
         z.height = 1 + max(self.get_height(z.left), self.get_height(z.right))
         y.height = 1 + max(self.get_height(y.left), self.get_height(y.right))
+        if self.order_stats:
+            self._shift += self.get_size(z.left) - self.get_size(y.right)
+            z.size = 1 + self.get_size(z.left) + self.get_size(z.right)
+            y.size = 1 + z.size + self.get_size(y.right)
         return y
 
-    def insert(self, key):
-        self.root = self._insert_recursive(self.root, key)
+    def insert(self, key, value=None):
+        matched = self._matched
+        self._shift = 0
+        self.root = self._insert_node(self.root, key, value, self.duplicates)
+        if self._matched == matched:
+            if self._size is not None: self._size += 1
+            self._reshaped()
 
-    def _insert_recursive(self, node, key):
-        if not node: return Node(key)
-        
-        self.stats['comparisons'] += 1
-        if key < node.key: node.left = self._insert_recursive(node.left, key)
-        else: node.right = self._insert_recursive(node.right, key)
+    def put(self, key, value):
+        """Maps key to value. An existing key is updated in place: one descent, no rebalancing."""
+        matched = self._matched
+        self._shift = 0
+        self.root = self._insert_node(self.root, key, value, 'replace')
+        if self._matched == matched:
+            if self._size is not None: self._size += 1
+            self._reshaped()
 
-        node.height = 1 + max(self.get_height(node.left), self.get_height(node.right))
-        balance = self.get_balance(node)
+    def _insert_node(self, root, key, value, duplicates, new=None):
+        """Inserts key into the subtree at root and returns the new subtree root.
 
-        if balance > 1 and key < node.left.key: return self._rotate_right(node)
-        if balance < -1 and key > node.right.key: return self._rotate_left(node)
-        if balance > 1 and key > node.left.key:
-            node.left = self._rotate_left(node.left)
-            return self._rotate_right(node)
-        if balance < -1 and key < node.right.key:
-            node.right = self._rotate_right(node.right)
-            return self._rotate_left(node)
-        return node
+        duplicates says what happens when the key is already present: 'allow' adds
+        another node (to the right), 'reject' ignores it, 'replace' overwrites the
+        stored value and 'count' bumps its multiplicity. The node is only
+        allocated once the key is known to be missing; `new` links a detached
+        node instead (and a 'count' match adds its multiplicity).
+        """
+        path = self._path
+        path.clear()
+        node = root
+        while node:
+            path.append(node)
+            if key < node.key: node = node.left
+            elif key == node.key and duplicates != 'allow':
+                self.stats['comparisons'] += len(path)
+                self.stats['duplicates'] += 1
+                self._matched += 1
+                if duplicates == 'replace': node.value = value
+                elif duplicates == 'count': node.count += new.count if new else 1
+                return root
+            else: node = node.right
+        self.stats['comparisons'] += len(path)
+        if new is None: new = Node(key, value)
+        if self.order_stats:
+            self._shift += len(path)
+            for node in path: node.size += 1
+
+        if not path: return new
+        parent = path[-1]
+        if key < parent.key: parent.left = new
+        else: parent.right = new
+        return self._retrace(path, len(path) - 1)
 
     def delete(self, key):
-        self.root = self._delete_recursive(self.root, key)
+        """Deletes one occurrence of key; returns whether it was present."""
+        matched, decrements = self._matched, self._decrements
+        self._shift = 0
+        self.root = self._delete_key(self.root, key)
+        if self._matched == matched: return False
+        if self._size is not None and self._decrements == decrements: self._size -= 1
+        self._reshaped()
+        return True
+
+    def _reshaped(self):
+        """Bumps the version after a single insert/delete, carrying the path length accounted in _shift.
+
+        Bulk operations bump _version directly, which leaves _ipl stale until
+        get_average_depth() recomputes it.
+        """
+        if self._ipl is not None and self._ipl_version == self._version:
+            self._ipl += self._shift
+            self._ipl_version += 1
+        self._version += 1
+
+    def _delete_key(self, root, key, copies=1):
+        """Deletes one occurrence of key from the subtree at root and returns the new subtree root.
+
+        In 'count' mode a node loses `copies` of its multiplicity and is only
+        removed once none are left.
+        """
+        path = self._path
+        path.clear()
+        node = root
+        while node:
+            path.append(node)
+            if key < node.key: node = node.left
+            elif key > node.key: node = node.right
+            else: break
+        else:
+            self.stats['comparisons'] += len(path)
+            return root
+        if node.count > copies:
+            self.stats['comparisons'] += len(path)
+            self._matched += 1
+            self._decrements += 1
+            node.count -= copies
+            return root
+
+        if node.left and node.right:
+            if self._choose_replacement(node) == 'left':
+                current = node.left
+                while current:
+                    path.append(current)
+                    current = current.right
+            else:
+                current = node.right
+                while current:
+                    path.append(current)
+                    current = current.left
+            node.key = path[-1].key
+            node.value = path[-1].value
+            node.count = path[-1].count
+        self.stats['comparisons'] += len(path)
+        self._matched += 1
+
+        removed = path.pop()
+        child = removed.left if removed.left else removed.right
+        if self.order_stats:
+            self._shift -= len(path) + self.get_size(child)
+            for node in path: node.size -= 1
+        if not path: return child
+        if path[-1].left is removed: path[-1].left = child
+        else: path[-1].right = child
+        return self._retrace(path, len(path) - 1)
 
     def _choose_replacement(self, node):
-        use_predecessor = False
-        if self.mode == 'standard':
-            use_predecessor = False 
-        elif self.mode == 'optimized':
+        """Returns the side ('left' = predecessor, 'right' = successor) that replaces a node with two children."""
+        if self.mode == 'optimized':
             if self.get_height(node.left) > self.get_height(node.right):
-                use_predecessor = True
-        
-        if use_predecessor:
-            temp = self._get_max_node(node.left)
-            new_key = temp.key
-            new_sub = self._delete_recursive(node.left, new_key)
-            return new_key, new_sub, 'left'
-        else:
-            temp = self._get_min_node(node.right)
-            new_key = temp.key
-            new_sub = self._delete_recursive(node.right, new_key)
-            return new_key, new_sub, 'right'
-
-    def _delete_recursive(self, node, key):
-        if not node: return node
-        self.stats['comparisons'] += 1
-        
-        if key < node.key: node.left = self._delete_recursive(node.left, key)
-        elif key > node.key: node.right = self._delete_recursive(node.right, key)
-        else:
-            if node.left is None: return node.right
-            elif node.right is None: return node.left
-            
-            new_key, new_sub, side = self._choose_replacement(node)
-            node.key = new_key
-            if side == 'left': node.left = new_sub
-            else: node.right = new_sub
-
-        if node is None: return node
-        
-        node.height = 1 + max(self.get_height(node.left), self.get_height(node.right))
-        balance = self.get_balance(node)
+                return 'left'
+        return 'right'
 
-        if balance > 1 and self.get_balance(node.left) >= 0: return self._rotate_right(node)
-        if balance > 1 and self.get_balance(node.left) < 0:
-            node.left = self._rotate_left(node.left)
+    def _rebalance(self, node):
+        """Refreshes node's height and applies the rotation it needs; returns the new subtree root."""
+        left_height = node.left.height if node.left else 0
+        right_height = node.right.height if node.right else 0
+        balance = left_height - right_height
+
+        if balance > 1:
+            if self.get_balance(node.left) < 0: node.left = self._rotate_left(node.left)
             return self._rotate_right(node)
-        if balance < -1 and self.get_balance(node.right) <= 0: return self._rotate_left(node)
-        if balance < -1 and self.get_balance(node.right) > 0:
-            node.right = self._rotate_right(node.right)
+        if balance < -1:
+            if self.get_balance(node.right) > 0: node.right = self._rotate_right(node.right)
             return self._rotate_left(node)
+        node.height = 1 + (left_height if left_height > right_height else right_height)
+        if self.order_stats: node.size = 1 + self.get_size(node.left) + self.get_size(node.right)
         return node
+
+    def _retrace(self, path, i):
+        """Rebalances path[i], path[i-1], ... bottom-up, stopping as soon as a subtree keeps its height.
+
+        Returns the (possibly rotated) node that now sits where path[0] was.
+        """
+        while i > 0:
+            node = path[i]
+            old_height = node.height
+            sub = self._rebalance(node)
+            if sub is not node:
+                if path[i - 1].left is node: path[i - 1].left = sub
+                else: path[i - 1].right = sub
+            if sub.height == old_height: return path[0]
+            i -= 1
+        return self._rebalance(path[0])
+
+    def _join(self, left, mid, right):
+        """Links left, mid and right (keys in that order) into one balanced subtree, reusing mid as the pivot node."""
+        mid = self._own(mid)
+        left_height = self.get_height(left)
+        right_height = self.get_height(right)
+        if left_height > right_height + 1:
+            spine = []
+            node = left
+            while self.get_height(node) > right_height + 1:
+                node = self._own(node)
+                spine.append(node)
+                node = node.right
+            mid.left, mid.right = node, right
+            sub = self._rebalance(mid)
+            for parent in reversed(spine):
+                parent.right = sub
+                sub = self._rebalance(parent)
+            return sub
+        if right_height > left_height + 1:
+            spine = []
+            node = right
+            while self.get_height(node) > left_height + 1:
+                node = self._own(node)
+                spine.append(node)
+                node = node.left
+            mid.left, mid.right = left, node
+            sub = self._rebalance(mid)
+            for parent in reversed(spine):
+                parent.left = sub
+                sub = self._rebalance(parent)
+            return sub
+        mid.left, mid.right = left, right
+        mid.height = 1 + max(left_height, right_height)
+        if self.order_stats: mid.size = 1 + self.get_size(left) + self.get_size(right)
+        return mid
+
+    def _join2(self, left, right):
+        """Joins two subtrees without a pivot by detaching the maximum of left."""
+        if not left: return right
+        spine = []
+        node = left
+        while node.right:
+            node = self._own(node)
+            spine.append(node)
+            node = node.right
+        sub = node.left
+        for parent in reversed(spine):
+            parent.right = sub
+            sub = self._rebalance(parent)
+        return self._join(sub, node, right)
+
+    def _split(self, node, key):
+        """Splits a subtree into (keys < key, node holding key or None, keys > key)."""
+        path = []
+        while node and key != node.key:
+            path.append(node)
+            node = node.left if key < node.key else node.right
+        self.stats['comparisons'] += len(path) + (1 if node else 0)
+        if node: self._matched += 1
+
+        if node: left, right = node.left, node.right
+        else: left = right = None
+        for parent in reversed(path):
+            if key < parent.key: right = self._join(right, parent, parent.right)
+            else: left = self._join(parent.left, parent, left)
+        return left, node, right
+
+    def _union(self, a, b):
+        """Merges subtree b into subtree a; keys of b already in a are dropped ('count' mode adds their multiplicities).
+
+        Recursion depth is bounded by the height of a.
+        """
+        if not a: return b
+        if not b: return a
+        counting = self.duplicates == 'count'
+        if not b.left and not b.right: return self._insert_node(a, b.key, b.value, 'count' if counting else 'reject', b)
+        left, found, right = self._split(b, a.key)
+        if found and counting:
+            a = self._own(a)
+            a.count += found.count
+        left = self._union(a.left, left)
+        right = self._union(a.right, right)
+        return self._join(left, a, right)
+
+    def _difference(self, a, b):
+        """Removes the keys of subtree b from subtree a ('count' mode subtracts b's multiplicities).
+
+        Recursion depth is bounded by the height of b.
+        """
+        if not a: return None
+        if not b: return a
+        counting = self.duplicates == 'count'
+        if not b.left and not b.right: return self._delete_key(a, b.key, b.count if counting else 1)
+        left, found, right = self._split(a, b.key)
+        left = self._difference(left, b.left)
+        right = self._difference(right, b.right)
+        if found and counting and found.count > b.count:
+            found = self._own(found)
+            found.count -= b.count
+            self._decrements += 1
+            return self._join(left, found, right)
+        return self._join2(left, right)
+
+    def _intersection(self, a, b):
+        """Keeps the nodes of subtree a whose keys also appear in subtree b ('count' mode keeps the smaller multiplicity).
+
+        Recursion depth is bounded by the height of a.
+        """
+        if not a or not b: return None
+        left, found, right = self._split(b, a.key)
+        left = self._intersection(a.left, left)
+        right = self._intersection(a.right, right)
+        if found:
+            if self.duplicates == 'count' and found.count < a.count:
+                a = self._own(a)
+                a.count = found.count
+            return self._join(left, a, right)
+        return self._join2(left, right)
+
+    def _batch(self, keys):
+        """Returns (number of distinct keys, balanced subtree of them); in 'count' mode a node counts how often its key was listed."""
+        keys, counts = _runs(sorted(keys))
+        return len(keys), self._build_balanced(keys, 0, len(keys), counts if self.duplicates == 'count' else None)
+
+    def insert_many(self, keys):
+        """Inserts a batch of keys with one split/join union. Keys already in the tree are skipped.
+
+        In 'count' mode every listed occurrence adds one copy instead, as insert() would.
+        """
+        n, batch = self._batch(keys)
+        matched = self._matched
+        self.root = self._union(self.root, batch)
+        if self._size is not None: self._size += n - (self._matched - matched)
+        self._version += 1
+
+    def delete_many(self, keys):
+        """Deletes a batch of keys with one split/join difference. Missing keys are ignored.
+
+        Each distinct key loses one occurrence; in 'count' mode every listed
+        occurrence removes one copy instead, as delete() would.
+        """
+        _, batch = self._batch(keys)
+        matched, decrements = self._matched, self._decrements
+        self.root = self._difference(self.root, batch)
+        if self._size is not None: self._size -= (self._matched - matched) - (self._decrements - decrements)
+        self._version += 1
+
+    def search_many(self, keys):
+        """Looks up a batch of keys in one descent, splitting the sorted queries at each node.
+
+        Returns a list of booleans aligned with the input order.
+        """
+        return [node is not None for node in self._find_many(keys)]
+
+    def get_many(self, keys, default=None):
+        """Batched get(): the values of keys (default when missing) from one shared descent."""
+        return [default if node is None else node.value for node in self._find_many(keys)]
+
+    def put_many(self, items):
+        """Batched put() of (key, value) pairs; a later pair for the same key wins.
+
+        Present keys are updated in place and the new ones join with one insert_many union.
+        """
+        latest = dict(items)
+        keys = list(latest)
+        new = []
+        for key, node in zip(keys, self._find_many(keys)):
+            if node is None: new.append(key)
+            else: node.value = latest[key]
+        if new:
+            self.insert_many(new)
+            for key, node in zip(new, self._find_many(new)): node.value = latest[key]
+
+    def _find_many(self, keys):
+        """Returns the node holding each key (None when missing), aligned with the input order."""
+        keys = list(keys)
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        queries = [keys[i] for i in order]
+        found = [None] * len(keys)
+        stack = [(self.root, 0, len(queries))] if self.root and queries else []
+        while stack:
+            node, lo, hi = stack.pop()
+            if hi - lo == 1:
+                key = queries[lo]
+                while node:
+                    if key == node.key:
+                        found[order[lo]] = node
+                        break
+                    node = node.left if key < node.key else node.right
+                continue
+            i = bisect_left(queries, node.key, lo, hi)
+            j = i
+            while j < hi and queries[j] == node.key:
+                found[order[j]] = node
+                j += 1
+            if node.left and i > lo: stack.append((node.left, lo, i))
+            if node.right and j < hi: stack.append((node.right, j, hi))
+        return found
     
+    @classmethod
+    def join(cls, left, pivot, right):
+        """Returns a new tree holding left's keys, pivot and right's keys in O(|height difference|).
+
+        Every key of left must be <= pivot <= every key of right. Both trees are
+        consumed: their nodes move into the result and they are left empty.
+        """
+        if left.root and left._get_max_node(left.root).key > pivot:
+            raise ValueError("join() needs every key of left to be <= pivot")
+        if right.root and right._get_min_node(right.root).key < pivot:
+            raise ValueError("join() needs every key of right to be >= pivot")
+        tree = left._empty_like()
+        size = len(left) + len(right) + 1
+        tree.root = tree._join(left.root, Node(pivot), right.root)
+        tree._size = size
+        left.root = right.root = None
+        left._size = right._size = 0
+        left._version += 1
+        right._version += 1
+        return tree
+
+    def split(self, key):
+        """Splits the tree around key in O(log n) and returns (keys < key, key was present, keys > key).
+
+        The tree is consumed: its nodes move into the two returned trees and it is left empty.
+        """
+        left, found, right = self._split(self.root, key)
+        lower, upper = self._empty_like(), self._empty_like()
+        lower.root, upper.root = left, right
+        if self.order_stats:
+            lower._size, upper._size = self.get_size(left), self.get_size(right)
+        else:
+            lower._size = upper._size = None
+        self.root = None
+        self._size = 0
+        self._version += 1
+        return lower, found is not None, upper
+
+    def _set_operation(self, other, operation):
+        """Runs a node-level set operation. In 'count' mode it works on multiplicities."""
+        result = self._empty_like()
+        result.root = operation(result, self.root, other.root)
+        self.root = other.root = None
+        self._size = other._size = 0
+        self._version += 1
+        other._version += 1
+        return result
+
+    def union(self, other):
+        """Returns a new tree with the keys of both trees; the operands are left untouched.
+
+        Runs consume_union() on copies: O(n + m) here, O(1) extra on
+        PersistentAVLTree, whose copy() is a snapshot.
+        """
+        return self.copy().consume_union(other.copy())
+
+    def intersection(self, other):
+        """Returns a new tree with the keys present in both trees; the operands are left untouched."""
+        return self.copy().consume_intersection(other.copy())
+
+    def difference(self, other):
+        """Returns a new tree with the keys of this tree that are not in other; the operands are left untouched."""
+        return self.copy().consume_difference(other.copy())
+
+    def consume_union(self, other):
+        """union() in O(m log(n/m + 1)) that moves the nodes of both trees into the result and leaves them empty."""
+        size = len(self) + len(other)
+        result = self._set_operation(other, AVLTree._union)
+        result._size = size - result._matched
+        return result
+
+    def consume_intersection(self, other):
+        """intersection() that moves the nodes of both trees into the result and leaves them empty."""
+        result = self._set_operation(other, AVLTree._intersection)
+        result._size = result._matched
+        return result
+
+    def consume_difference(self, other):
+        """difference() that moves the nodes of both trees into the result and leaves them empty."""
+        size = len(self)
+        result = self._set_operation(other, AVLTree._difference)
+        result._size = size - result._matched + result._decrements
+        return result
+
+    def copy(self):
+        """Returns an independent copy with the same shape, configuration and stats."""
+        tree = self._empty_like()
+        tree.root = self._copy_subtree(self.root)
+        tree.stats = dict(self.stats)
+        tree._size = self._size
+        return tree
+
+    def _copy_subtree(self, node):
+        if not node: return None
+        new = Node(node.key, node.value)
+        new.height = node.height
+        new.size = node.size
+        new.count = node.count
+        new.left = self._copy_subtree(node.left)
+        new.right = self._copy_subtree(node.right)
+        return new
+
+    def freeze(self):
+        """Returns a read-only FrozenAVLTree (flat sorted / Eytzinger layouts) of the current keys.
+
+        The view is cached and only rebuilt, in O(n), when freeze() is called
+        again after the tree has been modified.
+        """
+        if self._frozen is None or self._frozen_version != self._version:
+            self._frozen = FrozenAVLTree(self)
+            self._frozen_version = self._version
+        return self._frozen
+
+    def _flatten(self):
+        """Returns the tree as preorder NumPy arrays (keys, left, right; -1 = no child), cached until the next change."""
+        if self._flat is None or self._flat_version != self._version:
+            np = import_numpy()
+            nodes = []
+            stack = [self.root] if self.root else []
+            while stack:
+                node = stack.pop()
+                nodes.append(node)
+                if node.right: stack.append(node.right)
+                if node.left: stack.append(node.left)
+            index = {id(node): i for i, node in enumerate(nodes)}
+            self._flat = (np.array([node.key for node in nodes]),
+                          np.array([index[id(node.left)] if node.left else -1 for node in nodes], dtype=np.int64),
+                          np.array([index[id(node.right)] if node.right else -1 for node in nodes], dtype=np.int64))
+            self._flat_version = self._version
+        return self._flat
+
+    def search_batch(self, keys, details=False):
+        """Vectorized search for a whole array of keys; returns a NumPy bool array.
+
+        With details=True returns (found, positions, depths) instead, where
+        positions index the flattened preorder arrays and depths count edges
+        from the root (-1 for misses). Needs NumPy.
+        """
+        flat_keys, left, right = self._flatten()
+        result = descend_batch(flat_keys, left, right, 0 if self.root else -1, keys)
+        return result if details else result[0]
+
     def search(self, key):
         current = self.root
         while current:
@@ -144,22 +688,459 @@ class AVLTree:
                 current = current.right
         return False
     
-    def _count_nodes(self, node):
-        if not node: return 0
-        return 1 + self._count_nodes(node.left) + self._count_nodes(node.right)
+    def min(self):
+        if not self.root: raise ValueError("min() of an empty tree")
+        return self._get_min_node(self.root).key
 
-    def _get_internal_path_length(self, node, current_depth):
-        """Calculates the sum of depths of all nodes."""
-        if not node: return 0
-        return current_depth + \
-               self._get_internal_path_length(node.left, current_depth + 1) + \
-               self._get_internal_path_length(node.right, current_depth + 1)
+    def max(self):
+        if not self.root: raise ValueError("max() of an empty tree")
+        return self._get_max_node(self.root).key
+
+    def floor(self, key):
+        """Returns the largest key <= key, or None."""
+        result = None
+        node = self.root
+        while node:
+            if key < node.key:
+                node = node.left
+            else:
+                result = node.key
+                if key == node.key: break
+                node = node.right
+        return result
+
+    def ceiling(self, key):
+        """Returns the smallest key >= key, or None."""
+        result = None
+        node = self.root
+        while node:
+            if node.key < key:
+                node = node.right
+            else:
+                result = node.key
+                if key == node.key: break
+                node = node.left
+        return result
+
+    def irange(self, lo=None, hi=None, reverse=False):
+        """Lazily yields the keys in [lo, hi) in order (or in reverse); None leaves a bound open.
+
+        Uses one explicit stack of at most height nodes and raises RuntimeError
+        if the tree is modified while the iterator is suspended.
+        """
+        return map(_KEY, self._iter_nodes(lo, hi, reverse))
+
+    def _iter_nodes(self, lo=None, hi=None, reverse=False):
+        version = self._version
+        stack = []
+        node = self.root
+        if not reverse:
+            while node:
+                if lo is not None and node.key < lo: node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+            while stack:
+                node = stack.pop()
+                if hi is not None and not node.key < hi: return
+                yield node
+                if self._version != version: raise RuntimeError("AVLTree changed during iteration")
+                node = node.right
+                while node:
+                    stack.append(node)
+                    node = node.left
+        else:
+            while node:
+                if hi is not None and not node.key < hi: node = node.left
+                else:
+                    stack.append(node)
+                    node = node.right
+            while stack:
+                node = stack.pop()
+                if lo is not None and node.key < lo: return
+                yield node
+                if self._version != version: raise RuntimeError("AVLTree changed during iteration")
+                node = node.left
+                while node:
+                    stack.append(node)
+                    node = node.right
+
+    def __iter__(self):
+        return self.irange()
+
+    def __reversed__(self):
+        return self.irange(reverse=True)
+
+    def _find_node(self, key):
+        node = self.root
+        while node:
+            if key == node.key: return node
+            node = node.left if key < node.key else node.right
+        return None
+
+    def __contains__(self, key):
+        return self.search(key)
+
+    def __getitem__(self, key):
+        node = self._find_node(key)
+        if node is None: raise KeyError(key)
+        return node.value
+
+    def __setitem__(self, key, value):
+        self.put(key, value)
+
+    def __delitem__(self, key):
+        if not self.delete(key): raise KeyError(key)
+
+    def get(self, key, default=None):
+        node = self._find_node(key)
+        return default if node is None else node.value
+
+    def setdefault(self, key, default=None):
+        node = self._find_node(key)
+        if node is not None: return node.value
+        self.put(key, default)
+        return default
+
+    def pop(self, key, default=_MISSING):
+        node = self._find_node(key)
+        if node is None:
+            if default is _MISSING: raise KeyError(key)
+            return default
+        value = node.value
+        self.delete(key)
+        return value
+
+    def clear(self):
+        self.root = None
+        self._size = 0
+        self._version += 1
+
+    def items(self):
+        """Ordered (key, value) view."""
+        return _ItemsView(self)
+
+    def values(self):
+        """Values in key order."""
+        return _ValuesView(self)
+
+    def cursor(self, key=None):
+        """Returns a Cursor on the smallest key >= key (the minimum when key is None)."""
+        path = []
+        node = self.root
+        while node:
+            path.append(node)
+            if key is not None and node.key < key: node = node.right
+            else: node = node.left
+        if key is not None:
+            while path and path[-1].key < key: path.pop()
+        return Cursor(self, path)
+
+    def locate(self, key):
+        """Searches key and returns a Finger resting where the search ended; finger.found tells if key is present."""
+        finger = Finger(self)
+        finger.search(key)
+        return finger
+
+    def use_finger(self, enabled=True):
+        """Opts search() (and `in`) into finger search: each lookup resumes from the previous one's path.
+
+        Pays off on sorted or clustered query streams. The finger is shared
+        state, so do not combine it with concurrent readers.
+        """
+        if enabled: self.search = Finger(self).search
+        else: self.__dict__.pop('search', None)
+
+    def use_replacement(self, strategy=None):
+        """Hands the two-child deletion choice to a strategy from replacement.py, by name or instance.
+
+        None restores the fixed policy of the mode. Returns the attached strategy.
+        """
+        return set_replacement(self, strategy)
+
+    def __len__(self):
+        """Number of keys iteration yields: one per node, so 'count' mode counts a key once (see total())."""
+        if self._size is None: self._size = sum(1 for _ in self._iter_nodes())
+        return self._size
+
+    def total(self):
+        """Number of stored copies, including every multiplicity of 'count' mode, in O(n)."""
+        return sum(node.count for node in self._iter_nodes())
+
+    def count(self, key):
+        """Returns how many copies of key the tree holds."""
+        node = self._find_node(key)
+        if node is None: return 0
+        if self.duplicates != 'allow': return node.count
+        cursor = self.cursor(key)
+        n = 0
+        while cursor.valid and cursor.key == key:
+            n += 1
+            cursor.next()
+        return n
+
+    def _require_order_stats(self, method):
+        if not self.order_stats:
+            raise RuntimeError(f"{method}() requires a tree built with order_stats=True")
+
+    def rank(self, key):
+        """Returns how many keys are strictly smaller than key, in O(log n)."""
+        self._require_order_stats('rank')
+        rank = 0
+        node = self.root
+        while node:
+            if node.key < key:
+                rank += 1 + self.get_size(node.left)
+                node = node.right
+            else:
+                node = node.left
+        return rank
+
+    def select(self, k):
+        """Returns the k-th smallest key (0-based), in O(log n)."""
+        self._require_order_stats('select')
+        if not 0 <= k < self.get_size(self.root):
+            raise IndexError("select index out of range")
+        node = self.root
+        while True:
+            left_size = self.get_size(node.left)
+            if k < left_size:
+                node = node.left
+            elif k == left_size:
+                return node.key
+            else:
+                k -= left_size + 1
+                node = node.right
+
+    def count_range(self, lo, hi):
+        """Returns how many keys fall in [lo, hi), in O(log n)."""
+        if hi <= lo: return 0
+        return self.rank(hi) - self.rank(lo)
+
+    def _path_length(self):
+        """Returns (node count, sum of node depths) in one iterative pass."""
+        n = total = 0
+        stack = [(self.root, 0)] if self.root else []
+        while stack:
+            node, depth = stack.pop()
+            n += 1
+            total += depth
+            if node.left: stack.append((node.left, depth + 1))
+            if node.right: stack.append((node.right, depth + 1))
+        return n, total
+
+    def get_internal_path_length(self):
+        """Returns the sum of the depths of all nodes.
+
+        With order_stats=True this is kept up to date by insert/put/delete
+        (rotations and attach/detach adjust it by subtree sizes), so after one
+        full pass it costs O(1); bulk operations trigger one more pass.
+        """
+        if not self.order_stats: return self._path_length()[1]
+        if self._ipl is None or self._ipl_version != self._version:
+            self._ipl = self._path_length()[1]
+            self._ipl_version = self._version
+        return self._ipl
 
     def get_average_depth(self):
-        """Returns the average depth of nodes in the tree."""
+        """Returns the average depth of nodes in the tree; O(1) with order_stats=True."""
         if not self.root: return 0
-        n = self._count_nodes(self.root)
-        if n == 0: return 0
-        
-        total_path_length = self._get_internal_path_length(self.root, 0)
-        return total_path_length / n
\ No newline at end of file
+        if self.order_stats: return self.get_internal_path_length() / self.root.size
+        n, total = self._path_length()
+        return total / n
+
+    def get_memory_footprint(self):
+        """Returns the bytes held by Node objects, measured with tracemalloc per node class, excluding the keys themselves."""
+        counts = {}
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            counts[type(node)] = counts.get(type(node), 0) + 1
+            if node.left: stack.append(node.left)
+            if node.right: stack.append(node.right)
+        return sum(n * _node_bytes(cls) for cls, n in counts.items())
+
+    def save(self, path):
+        """Writes the tree shape to path in the fixed-width binary format of avl_storage.
+
+        Keys must be 64-bit integers; values are not stored.
+        """
+        nodes = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            if node.right: stack.append(node.right)
+            if node.left: stack.append(node.left)
+        index = {id(node): i for i, node in enumerate(nodes)}
+        pack = RECORD.pack
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, MODES.index(self.mode), DUPLICATES.index(self.duplicates), len(nodes)))
+            f.write(b''.join(pack(node.key,
+                                  index[id(node.left)] if node.left else -1,
+                                  index[id(node.right)] if node.right else -1,
+                                  node.height, node.count) for node in nodes))
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Rebuilds a tree written by save() in O(n): nodes are relinked as stored, no rotations.
+
+        mode and duplicates default to the saved ones; keyword arguments override them.
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+        mode, duplicates, n = read_header(data)
+        kwargs.setdefault('duplicates', duplicates)
+        tree = cls(kwargs.pop('mode', mode), **kwargs)
+        records = list(RECORD.iter_unpack(memoryview(data)[HEADER.size:HEADER.size + n * RECORD.size]))
+        nodes = [Node(key) for key, _, _, _, _ in records]
+        for node, (_, left, right, height, count) in zip(nodes, records):
+            if left >= 0: node.left = nodes[left]
+            if right >= 0: node.right = nodes[right]
+            node.height = height
+            node.count = count
+        if tree.order_stats:
+            # children follow their parent in preorder, so a reverse sweep sees them first
+            for node in reversed(nodes): node.size = 1 + tree.get_size(node.left) + tree.get_size(node.right)
+        tree.root = nodes[0] if nodes else None
+        tree._size = len(nodes)
+        return tree
+
+
+_KEY = attrgetter('key')
+
+
+def _runs(keys):
+    """Collapses sorted keys into (distinct keys, length of each run)."""
+    unique = []
+    counts = []
+    for key in keys:
+        if unique and unique[-1] == key: counts[-1] += 1
+        else:
+            unique.append(key)
+            counts.append(1)
+    return unique, counts
+
+
+class _ItemsView(ItemsView):
+    def __iter__(self):
+        for node in self._mapping._iter_nodes():
+            yield node.key, node.value
+
+
+class _ValuesView(ValuesView):
+    def __iter__(self):
+        return map(attrgetter('value'), self._mapping._iter_nodes())
+
+
+class Cursor:
+    """Ordered position inside an AVLTree.
+
+    Keeps the root-to-node path, so next()/prev() run in amortized O(1). Any
+    modification of the tree invalidates the cursor (RuntimeError on use).
+    """
+
+    def __init__(self, tree, path):
+        self._tree = tree
+        self._path = path
+        self._version = tree._version
+
+    def _check(self):
+        if self._tree._version != self._version:
+            raise RuntimeError("AVLTree changed since the cursor was created")
+
+    @property
+    def valid(self):
+        """False once the cursor has moved past either end of the tree."""
+        return bool(self._path)
+
+    @property
+    def key(self):
+        self._check()
+        if not self._path: raise IndexError("cursor is past the end of the tree")
+        return self._path[-1].key
+
+    def next(self):
+        """Moves to the successor; returns False when it falls off the end."""
+        self._check()
+        path = self._path
+        if not path: return False
+        node = path[-1].right
+        if node:
+            while node:
+                path.append(node)
+                node = node.left
+        else:
+            node = path.pop()
+            while path and path[-1].right is node: node = path.pop()
+        return bool(path)
+
+    def prev(self):
+        """Moves to the predecessor; returns False when it falls off the start."""
+        self._check()
+        path = self._path
+        if not path: return False
+        node = path[-1].left
+        if node:
+            while node:
+                path.append(node)
+                node = node.right
+        else:
+            node = path.pop()
+            while path and path[-1].left is node: node = path.pop()
+        return bool(path)
+
+
+class Finger:
+    """Remembers the root-to-node path of the last lookup so the next one can start lower down.
+
+    Every path entry keeps the open key interval its subtree covers. A lookup
+    climbs to the deepest entry whose interval strictly contains the new key
+    (the lowest common ancestor of both positions) and descends from there, so
+    nearby keys cost O(log distance) instead of O(log n). Any modification of
+    the tree just discards the path and the next lookup starts at the root.
+    """
+
+    def __init__(self, tree):
+        self._tree = tree
+        self._path = []
+        self._bounds = []
+        self._version = tree._version
+        self.found = False
+
+    @property
+    def key(self):
+        """Key of the node the finger rests on (None before any lookup on a non-empty tree)."""
+        return self._path[-1].key if self._path and self._version == self._tree._version else None
+
+    def search(self, key):
+        path, bounds = self._path, self._bounds
+        if self._version != self._tree._version:
+            path.clear()
+            bounds.clear()
+            self._version = self._tree._version
+        while path:
+            lo, hi = bounds[-1]
+            if (lo is None or lo < key) and (hi is None or key < hi): break
+            path.pop()
+            bounds.pop()
+        if path:
+            node = path.pop()
+            lo, hi = bounds.pop()
+        else:
+            node, lo, hi = self._tree.root, None, None
+        while node:
+            path.append(node)
+            bounds.append((lo, hi))
+            k = node.key
+            if key == k:
+                self.found = True
+                return True
+            if key < k:
+                hi = k
+                node = node.left
+            else:
+                lo = k
+                node = node.right
+        self.found = False
+        return False
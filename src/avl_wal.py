@@ -0,0 +1,228 @@
+import os
+import re
+import time
+import zlib
+import struct
+
+from avl_tree import AVLTree
+
+# Log file layout (little-endian):
+#   header: magic, format version, generation
+#   frames: record count, crc32 of the payload, then `count` records of (op code, key int64)
+# A frame is written with one write() call; recovery stops at the first short or
+# corrupt frame, which is the torn tail of a crash.
+LOG_MAGIC = b'AVLW'
+LOG_VERSION = 1
+LOG_HEADER = struct.Struct('<4sHq')
+FRAME = struct.Struct('<II')
+OP = struct.Struct('<Bq')
+INSERT, DELETE = 1, 2
+
+_FILE = re.compile(r'(checkpoint|wal)-(\d{8})\.(avlt|log)$')
+
+
+def checkpoint_path(directory, generation):
+    return os.path.join(directory, f'checkpoint-{generation:08d}.avlt')
+
+
+def log_path(directory, generation):
+    return os.path.join(directory, f'wal-{generation:08d}.log')
+
+
+def _generations(directory, kind):
+    if not os.path.isdir(directory): return []
+    return sorted(int(m.group(2)) for m in map(_FILE.match, os.listdir(directory)) if m and m.group(1) == kind)
+
+
+def _fsync_directory(directory):
+    """Makes renames and new files in directory durable (a no-op where directories cannot be opened)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def replay(path, tree=None):
+    """Applies the intact frames of the log at path to tree (or only validates them when tree is None).
+
+    Returns (records in intact frames, byte offset just past the last intact frame).
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < LOG_HEADER.size: return 0, 0
+    magic, version, _ = LOG_HEADER.unpack_from(data, 0)
+    if magic != LOG_MAGIC: raise ValueError(f"{path} is not an AVL write-ahead log")
+    if version != LOG_VERSION: raise ValueError(f"unsupported log format version {version}")
+    offset = LOG_HEADER.size
+    applied = 0
+    while offset + FRAME.size <= len(data):
+        count, crc = FRAME.unpack_from(data, offset)
+        end = offset + FRAME.size + count * OP.size
+        if end > len(data): break
+        payload = memoryview(data)[offset + FRAME.size:end]
+        if zlib.crc32(payload) != crc: break
+        if tree is not None:
+            for op, key in OP.iter_unpack(payload):
+                if op == INSERT: tree.insert(key)
+                else: tree.delete(key)
+        applied += count
+        offset = end
+    return applied, offset
+
+
+def recover(directory, tree_cls=AVLTree, **kwargs):
+    """Rebuilds the tree persisted in directory: the latest checkpoint, then the log tail after it.
+
+    Keyword arguments go to tree_cls.load() (or the constructor when there is
+    no checkpoint yet). Returns (tree, generation of the checkpoint, records replayed).
+    """
+    checkpoints = _generations(directory, 'checkpoint')
+    generation = checkpoints[-1] if checkpoints else 0
+    tree = tree_cls.load(checkpoint_path(directory, generation), **kwargs) if checkpoints else tree_cls(**kwargs)
+    replayed = 0
+    for g in _generations(directory, 'wal'):
+        if g >= generation: replayed += replay(log_path(directory, g), tree)[0]
+    return tree, generation, replayed
+
+
+class DurableAVLTree:
+    """AVLTree whose inserts and deletes are persisted through a write-ahead log in `directory`.
+
+    Every update is appended to an in-memory buffer before it is applied; the
+    buffer is written as one checksummed frame per group_size records, so the
+    log costs one write() per group instead of one per operation. fsync runs
+    at most every sync_interval seconds, checked when a frame is written
+    (0 = after every frame, None = only on sync(), checkpoint() and close()).
+    Updates are durable once sync() returns; a crash loses at most the
+    records after the last fsync.
+
+    checkpoint() saves the whole tree (AVLTree.save) and starts a new log
+    generation; with checkpoint_every set it also runs after that many
+    updates. Opening an existing directory recovers it first. Keys must be
+    64-bit integers and values are not persisted, as with save().
+    """
+
+    def __init__(self, directory, mode='standard', group_size=1024, sync_interval=0.0, checkpoint_every=None, **kwargs):
+        if group_size < 1: raise ValueError("group_size must be at least 1")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.group_size = group_size
+        self.sync_interval = sync_interval
+        self.checkpoint_every = checkpoint_every
+        self.stats = {'records': 0, 'frames': 0, 'syncs': 0, 'checkpoints': 0, 'replayed': 0}
+        for name in os.listdir(directory):
+            if name.endswith('.tmp'): os.remove(os.path.join(directory, name))
+        self.tree, self.generation, self.stats['replayed'] = recover(directory, mode=mode, **kwargs)
+        self._buffer = bytearray()
+        self._pending = 0
+        self._since_checkpoint = 0
+        self._last_sync = time.monotonic()
+        self._synced = 0
+        self._open_log()
+
+    def _open_log(self):
+        """Opens the log of the current generation for appending, cutting off a torn tail first."""
+        path = log_path(self.directory, self.generation)
+        if os.path.exists(path) and os.path.getsize(path) >= LOG_HEADER.size:
+            _, end = replay(path)
+            with open(path, 'rb+') as f: f.truncate(end)
+            self._log = open(path, 'ab', buffering=0)
+        else:
+            self._log = open(path, 'wb', buffering=0)
+            self._log.write(LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION, self.generation))
+            os.fsync(self._log.fileno())
+            _fsync_directory(self.directory)
+
+    def close(self):
+        if self._log.closed: return
+        self.sync()
+        self._log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _append(self, op, key):
+        self._buffer += OP.pack(op, key)
+        self._pending += 1
+        if self._pending >= self.group_size: self.flush()
+
+    def _applied(self):
+        self._since_checkpoint += 1
+        if self.checkpoint_every and self._since_checkpoint >= self.checkpoint_every: self.checkpoint()
+
+    def insert(self, key):
+        self._append(INSERT, key)
+        self.tree.insert(key)
+        self._applied()
+
+    def delete(self, key):
+        """Deletes one occurrence of key; returns whether it was present."""
+        self._append(DELETE, key)
+        found = self.tree.delete(key)
+        self._applied()
+        return found
+
+    def flush(self):
+        """Writes the buffered records as one frame, then fsyncs if sync_interval has elapsed."""
+        if self._pending:
+            payload = bytes(self._buffer)
+            self._log.write(FRAME.pack(self._pending, zlib.crc32(payload)) + payload)
+            self.stats['records'] += self._pending
+            self.stats['frames'] += 1
+            self._buffer.clear()
+            self._pending = 0
+        if self.sync_interval is not None and self._synced != self.stats['records'] and \
+                time.monotonic() - self._last_sync >= self.sync_interval: self._fsync()
+
+    def sync(self):
+        """Writes and fsyncs everything logged so far; on return every update is durable."""
+        self.flush()
+        if self._synced != self.stats['records']: self._fsync()
+
+    def _fsync(self):
+        os.fsync(self._log.fileno())
+        self.stats['syncs'] += 1
+        self._last_sync = time.monotonic()
+        self._synced = self.stats['records']
+
+    def checkpoint(self):
+        """Saves the tree as the next generation's checkpoint, starts its log and drops the older files.
+
+        The checkpoint is written to a temporary file and renamed into place,
+        so a crash at any point leaves either the old or the new generation
+        complete for recover().
+        """
+        self.sync()
+        generation = self.generation + 1
+        path = checkpoint_path(self.directory, generation)
+        self.tree.save(path + '.tmp')
+        with open(path + '.tmp', 'rb') as f: os.fsync(f.fileno())
+        os.replace(path + '.tmp', path)
+        _fsync_directory(self.directory)
+        self._log.close()
+        self.generation = generation
+        self._open_log()
+        for kind, path_of in [('checkpoint', checkpoint_path), ('wal', log_path)]:
+            for g in _generations(self.directory, kind):
+                if g < generation: os.remove(path_of(self.directory, g))
+        self._since_checkpoint = 0
+        self.stats['checkpoints'] += 1
+
+    def search(self, key):
+        return self.tree.search(key)
+
+    def __contains__(self, key):
+        return key in self.tree
+
+    def __len__(self):
+        return len(self.tree)
+
+    def __iter__(self):
+        return iter(self.tree)
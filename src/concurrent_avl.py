@@ -0,0 +1,141 @@
+import time
+import threading
+from contextlib import contextmanager
+
+from avl_tree import AVLTree
+
+
+class RWLock:
+    """Reader-writer lock: any number of readers, or one writer, handed over in time slices.
+
+    A waiting writer blocks newly arriving readers, but each writer release that
+    finds readers queued opens a read window of read_slice seconds before the
+    next writer may enter. With per-lookup locking this keeps a saturated writer
+    and a pool of readers from starving each other.
+    """
+
+    def __init__(self, read_slice=0.001):
+        self.read_slice = read_slice
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+        self._waiting_readers = 0
+        self._read_until = 0.0
+
+    def acquire_read(self):
+        with self._cond:
+            if self._writer or (self._waiting_writers and time.monotonic() >= self._read_until):
+                self._waiting_readers += 1
+                while self._writer or (self._waiting_writers and time.monotonic() >= self._read_until):
+                    self._cond.wait()
+                self._waiting_readers -= 1
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if not self._readers: self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            self._waiting_writers += 1
+            while True:
+                remaining = self._read_until - time.monotonic()
+                if not self._writer and not self._readers and remaining <= 0: break
+                self._cond.wait(remaining if remaining > 0 else None)
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._cond:
+            self._writer = False
+            if self._waiting_readers: self._read_until = time.monotonic() + self.read_slice
+            self._cond.notify_all()
+
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class ConcurrentAVLTree:
+    """Thread-safe front for an AVLTree.
+
+    Lookups and range scans share a read lock and run in parallel; every
+    mutation takes the write lock. Range scans are materialized while the read
+    lock is held, so each result is a consistent snapshot of the range.
+    """
+
+    def __init__(self, tree=None, mode='standard', **kwargs):
+        self.tree = tree if tree is not None else AVLTree(mode, **kwargs)
+        self.lock = RWLock()
+
+    def search(self, key):
+        with self.lock.read():
+            return self.tree.search(key)
+
+    def search_many(self, keys):
+        with self.lock.read():
+            return self.tree.search_many(keys)
+
+    def get(self, key, default=None):
+        with self.lock.read():
+            return self.tree.get(key, default)
+
+    def __contains__(self, key):
+        return self.search(key)
+
+    def __len__(self):
+        with self.lock.read():
+            return len(self.tree)
+
+    def range(self, lo=None, hi=None, reverse=False):
+        """Returns the keys in [lo, hi) as a list taken under one read lock."""
+        with self.lock.read():
+            return list(self.tree.irange(lo, hi, reverse))
+
+    def items(self, lo=None, hi=None):
+        """Returns the (key, value) pairs in [lo, hi) as a list taken under one read lock."""
+        with self.lock.read():
+            return [(node.key, node.value) for node in self.tree._iter_nodes(lo, hi)]
+
+    def snapshot(self):
+        """Returns an independent O(n) copy of the tree taken under the read lock."""
+        with self.lock.read():
+            return self.tree.copy()
+
+    def insert(self, key, value=None):
+        with self.lock.write():
+            self.tree.insert(key, value)
+
+    def put(self, key, value):
+        with self.lock.write():
+            self.tree.put(key, value)
+
+    def delete(self, key):
+        with self.lock.write():
+            return self.tree.delete(key)
+
+    def apply_batch(self, deletes=(), inserts=()):
+        """Applies all deletes, then all inserts, as one atomic write."""
+        with self.lock.write():
+            for key in deletes: self.tree.delete(key)
+            for key in inserts: self.tree.insert(key)
+
+    @contextmanager
+    def batch(self):
+        """Yields the underlying tree under the write lock; readers see either none or all of the changes."""
+        with self.lock.write():
+            yield self.tree
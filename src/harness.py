@@ -0,0 +1,219 @@
+import gc
+import os
+import csv
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+from itertools import accumulate
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from avl_array import BACKENDS
+
+SEED = 2024
+METHODS = ['Standard', 'Optimized']
+# two-sided 95% Student t critical values by degrees of freedom; 1.96 beyond the table
+T95 = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+       2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+       2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042]
+RUN_COLUMNS = ['Workload', 'Kind', 'Size', 'Ops', 'Backend', 'Method', 'Repetition', 'Seed', 'Metric', 'Value']
+SUMMARY_COLUMNS = ['Workload', 'Kind', 'Size', 'Ops', 'Backend', 'Method', 'Metric', 'Repetitions',
+                   'Median', 'Mean', 'P5', 'P95', 'CI95_Low', 'CI95_High', 'Min', 'Max']
+
+
+# --- WORKLOAD GENERATORS: (rng, size, ops, **params) -> (setup keys, [(op, key), ...]) ---
+
+def _random(rnd, n, ops):
+    """n shuffled inserts, then half of the keys deleted in shuffled order (benchmark_io 'Random')"""
+    keys = list(range(n))
+    rnd.shuffle(keys)
+    return keys, [('delete', k) for k in keys[:n // 2]]
+
+def _sorted(rnd, n, ops):
+    """Keys 0..n-1 inserted in order, then a random half deleted (benchmark_io 'Sorted')"""
+    victims = list(range(n))
+    rnd.shuffle(victims)
+    return list(range(n)), [('delete', k) for k in victims[:n // 2]]
+
+def _steady(rnd, n, ops):
+    """Long-running churn: each step deletes the oldest live key and inserts a fresh one"""
+    pool = list(range(2 * n))
+    rnd.shuffle(pool)
+    setup = pool[:n]
+    stream = []
+    for k in range(ops // 2):
+        rem = pool[k % n]
+        add = pool[(k + n) % len(pool)]
+        stream.append(('delete', rem))
+        stream.append(('insert', add))
+        pool[k % n] = add
+    return setup, stream
+
+def _zipf(rnd, n, ops, s=1.1):
+    """Searches whose key popularity follows a Zipf(s) law over the n stored keys"""
+    keys = list(range(n))
+    rnd.shuffle(keys)
+    cum = list(accumulate(1.0 / rank ** s for rank in range(1, n + 1)))
+    return keys, [('search', k) for k in rnd.choices(keys, cum_weights=cum, k=ops)]
+
+def _sliding(rnd, n, ops):
+    """Time-ordered window of n keys: insert the newest key, expire the oldest"""
+    stream = []
+    for i in range(ops // 2):
+        stream.append(('insert', n + i))
+        stream.append(('delete', i))
+    return list(range(n)), stream
+
+KINDS = {'random': _random, 'sorted': _sorted, 'steady': _steady, 'zipf': _zipf, 'sliding': _sliding}
+
+
+class Workload:
+    """Declarative workload spec: a generator kind, a tree size, an op count and its parameters.
+
+    generate(rep) is deterministic in (seed, name, size, rep), so every method
+    and backend replays exactly the same keys and the numbers can be compared
+    across machines and code versions.
+    """
+
+    def __init__(self, name, kind, size, ops=None, seed=SEED, **params):
+        if kind not in KINDS: raise ValueError(f"unknown workload kind {kind!r}; choose from {sorted(KINDS)}")
+        self.name = name
+        self.kind = kind
+        self.size = size
+        self.ops = size if ops is None else ops
+        self.seed = seed
+        self.params = params
+        self._stream_ops = None
+
+    def stream_ops(self):
+        """Operations in the generated stream; the random and sorted kinds always delete half the keys, whatever ops says."""
+        if self._stream_ops is None: self._stream_ops = len(self.generate(1)[1])
+        return self._stream_ops
+
+    def rep_seed(self, rep):
+        return f"{self.seed}:{self.name}:{self.size}:{rep}"
+
+    def generate(self, rep):
+        return KINDS[self.kind](random.Random(self.rep_seed(rep)), self.size, self.ops, **self.params)
+
+
+def standard_workloads(size, ops=None):
+    """The scenarios of the part1 scripts plus the Zipfian and sliding-window streams"""
+    ops = 2 * size if ops is None else ops
+    return [Workload('Random', 'random', size),
+            Workload('Sorted', 'sorted', size),
+            Workload('SteadyState', 'steady', size, ops),
+            Workload('Zipf', 'zipf', size, ops),
+            Workload('SlidingWindow', 'sliding', size, ops)]
+
+
+# --- MEASUREMENT ---
+
+def run_once(tree_cls, method, workload, rep):
+    """Builds the setup tree (untimed), then times the op stream with the GC collected and disabled."""
+    setup, stream = workload.generate(rep)
+    avl = tree_cls(method.lower())
+    for key in setup: avl.insert(key)
+    avl.reset_stats()
+    calls = [(getattr(avl, op), key) for op, key in stream]
+
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter_ns()
+        for call, key in calls: call(key)
+        elapsed = time.perf_counter_ns() - start
+    finally:
+        if gc_was_enabled: gc.enable()
+
+    return {'ns_per_op': elapsed / len(calls) if calls else 0.0,
+            'total_ms': elapsed / 1e6,
+            'rotations': avl.stats['rotations'],
+            'height': avl.get_height(avl.root),
+            'avg_depth': avl.get_average_depth()}
+
+def percentile(sorted_values, q):
+    """Linear-interpolated q-th percentile (0..100) of an already sorted list."""
+    pos = (len(sorted_values) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+def summarize(values):
+    """Median, mean, 5th/95th percentiles and the 95% t confidence interval of the mean."""
+    values = sorted(values)
+    mean = statistics.fmean(values)
+    if len(values) > 1:
+        t = T95[len(values) - 2] if len(values) - 1 <= len(T95) else 1.96
+        half = t * statistics.stdev(values) / len(values) ** 0.5
+    else:
+        half = 0.0
+    return {'Median': statistics.median(values), 'Mean': mean,
+            'P5': percentile(values, 5), 'P95': percentile(values, 95),
+            'CI95_Low': mean - half, 'CI95_High': mean + half,
+            'Min': values[0], 'Max': values[-1]}
+
+def run_benchmark(workloads, backends=('object',), methods=METHODS, repetitions=5, warmup=1, verbose=True):
+    """Runs every (workload, backend, method) for warmup + repetitions passes.
+
+    Returns (runs, summary): one row per repetition and metric, and one
+    summary row per metric, both as dicts keyed by RUN_COLUMNS / SUMMARY_COLUMNS.
+    """
+    runs, summary = [], []
+    for workload in workloads:
+        for backend in backends:
+            tree_cls = BACKENDS[backend]
+            for method in methods:
+                base = {'Workload': workload.name, 'Kind': workload.kind, 'Size': workload.size,
+                        'Ops': workload.stream_ops(), 'Backend': backend, 'Method': method}
+                for rep in range(-warmup, 0): run_once(tree_cls, method, workload, rep)
+                per_metric = {}
+                for rep in range(1, repetitions + 1):
+                    metrics = run_once(tree_cls, method, workload, rep)
+                    for metric, value in metrics.items():
+                        per_metric.setdefault(metric, []).append(value)
+                        runs.append(dict(base, Repetition=rep, Seed=workload.rep_seed(rep), Metric=metric, Value=value))
+                for metric, values in per_metric.items():
+                    summary.append(dict(base, Metric=metric, Repetitions=len(values), **summarize(values)))
+                if verbose:
+                    s = summarize(per_metric['ns_per_op'])
+                    print(f"    [{workload.name} N={workload.size} {backend}/{method}] "
+                          f"median {s['Median']:.1f} ns/op (95% CI {s['CI95_Low']:.1f}-{s['CI95_High']:.1f})")
+    return runs, summary
+
+def write_results(runs, summary, data_dir, prefix='results_harness'):
+    """Writes <prefix>_runs.csv, <prefix>_summary.csv and <prefix>.json (both tables) into data_dir."""
+    if not os.path.exists(data_dir): os.makedirs(data_dir)
+    for name, rows, columns in [('runs', runs, RUN_COLUMNS), ('summary', summary, SUMMARY_COLUMNS)]:
+        with open(os.path.join(data_dir, f'{prefix}_{name}.csv'), 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+    with open(os.path.join(data_dir, f'{prefix}.json'), 'w') as f:
+        json.dump({'seed': SEED, 'python': sys.version.split()[0], 'runs': runs, 'summary': summary}, f, indent=1)
+
+def main():
+    parser = argparse.ArgumentParser(description='Seeded AVL workloads with GC-controlled timing and summary statistics')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000])
+    parser.add_argument('--ops', type=int, default=None, help='ops per stream for steady/zipf/sliding (default 2 x size)')
+    parser.add_argument('--workloads', nargs='+', default=None, help='workload names to keep (default: all)')
+    parser.add_argument('--backends', nargs='+', choices=list(BACKENDS), default=['object'])
+    parser.add_argument('--repetitions', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    args = parser.parse_args()
+
+    workloads = [w for n in args.sizes for w in standard_workloads(n, args.ops)
+                 if args.workloads is None or w.name in args.workloads]
+    print(f"--- HARNESS: {len(workloads)} workloads x {args.backends} x {METHODS}, "
+          f"{args.warmup} warmup + {args.repetitions} reps ---")
+    runs, summary = run_benchmark(workloads, args.backends, METHODS, args.repetitions, args.warmup)
+
+    data_dir = os.path.join(os.path.dirname(__file__), '../data')
+    write_results(runs, summary, data_dir)
+    print(f"\nHarness Completed. Data saved to {os.path.abspath(data_dir)}/results_harness_*")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+from avl_tree import AVLTree
+
+ROTATION_CASES = ['LL', 'RR', 'LR', 'RL']
+
+
+class Instrumentation:
+    """Detailed AVLTree counters that cost nothing until attached.
+
+    attach(tree) shadows _rebalance, _retrace, _choose_replacement and search
+    on that tree instance with counting versions; detach() removes them, so the
+    class methods (and every other tree) stay untouched. Only AVLTree and its
+    subclasses are supported: ArrayAVLTree rotates inline without _rebalance.
+    The tree's own stats dict (rotations, comparisons) is left as it is.
+    Counters:
+
+    - rotations_LL/RR/LR/RL: rebalance cases (LL = left-left, one right rotation;
+      LR = left-right, a double rotation; RR/RL are the mirrors)
+    - retraces / retrace_steps: bottom-up passes after an update and the nodes
+      each one visited before stopping
+    - replacement_predecessor / replacement_successor: which side
+      _choose_replacement picked for two-child deletions
+    - searches / search_visits: lookups and the nodes they touched
+
+    snapshot() returns a copy of the counters; a `sink` callable, if given, also
+    receives every event as (name, value) for streaming.
+    """
+
+    def __init__(self, sink=None):
+        self.sink = sink
+        self._attached = []
+        self.reset()
+
+    def reset(self):
+        self.counters = dict.fromkeys(['rotations_' + case for case in ROTATION_CASES] +
+                                      ['retraces', 'retrace_steps', 'rebalance_calls',
+                                       'replacement_predecessor', 'replacement_successor',
+                                       'searches', 'search_visits'], 0)
+
+    def snapshot(self):
+        """Returns the counters plus derived averages."""
+        c = dict(self.counters)
+        c['avg_retrace_length'] = c['retrace_steps'] / c['retraces'] if c['retraces'] else 0.0
+        c['avg_search_visits'] = c['search_visits'] / c['searches'] if c['searches'] else 0.0
+        return c
+
+    def _emit(self, name, value=1):
+        self.counters[name] += value
+        if self.sink: self.sink(name, value)
+
+    def attach(self, tree):
+        if not isinstance(tree, AVLTree): raise TypeError(f"Instrumentation needs an AVLTree, not {type(tree).__name__}")
+        wrappers = {'_rebalance': self._wrap_rebalance, '_retrace': self._wrap_retrace,
+                    '_choose_replacement': self._wrap_choose_replacement, 'search': self._wrap_search}
+        for name, wrap in wrappers.items():
+            self._attached.append((tree, name, tree.__dict__.get(name)))
+            tree.__dict__[name] = wrap(tree, getattr(tree, name))
+        return tree
+
+    def detach(self):
+        while self._attached:
+            tree, name, previous = self._attached.pop()
+            if previous is None: tree.__dict__.pop(name, None)
+            else: tree.__dict__[name] = previous
+
+    def _wrap_rebalance(self, tree, rebalance):
+        balance = tree.get_balance
+        def counted(node):
+            self._emit('rebalance_calls')
+            b = balance(node)
+            if b > 1: self._emit('rotations_LR' if balance(node.left) < 0 else 'rotations_LL')
+            elif b < -1: self._emit('rotations_RL' if balance(node.right) > 0 else 'rotations_RR')
+            return rebalance(node)
+        return counted
+
+    def _wrap_retrace(self, tree, retrace):
+        def counted(path, i):
+            before = self.counters['rebalance_calls']
+            result = retrace(path, i)
+            self._emit('retraces')
+            self._emit('retrace_steps', self.counters['rebalance_calls'] - before)
+            return result
+        return counted
+
+    def _wrap_choose_replacement(self, tree, choose):
+        def counted(node):
+            side = choose(node)
+            self._emit('replacement_predecessor' if side == 'left' else 'replacement_successor')
+            return side
+        return counted
+
+    def _wrap_search(self, tree, search):
+        def counted(key):
+            probe = _CountingKey(key)
+            found = search(probe)
+            self._emit('searches')
+            self._emit('search_visits', probe.visits)
+            return found
+        return counted
+
+
+class _CountingKey:
+    """Stands in for a search key and counts its equality tests.
+
+    Both AVLTree.search and finger search test `key == node.key` once per node
+    they visit, so the real search path does the counting.
+    """
+
+    __slots__ = ('key', 'visits')
+    __hash__ = None
+
+    def __init__(self, key):
+        self.key = key
+        self.visits = 0
+
+    def __eq__(self, other):
+        self.visits += 1
+        return self.key == other
+
+    def __lt__(self, other):
+        return self.key < other
+
+    def __le__(self, other):
+        return self.key <= other
+
+    def __gt__(self, other):
+        return self.key > other
+
+    def __ge__(self, other):
+        return self.key >= other
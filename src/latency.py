@@ -0,0 +1,117 @@
+import time
+
+PERCENTILES = [50, 90, 99, 99.9]
+
+
+class LatencyHistogram:
+    """HDR-style histogram of nanosecond latencies with log-spaced, linearly subdivided buckets.
+
+    Values below 2 * 2**sub_bits land in exact buckets; above that every power
+    of two is split into 2**sub_bits buckets, so any recorded value is reported
+    within a relative error of 2**-sub_bits (about 3% with the default 5).
+    Memory is fixed at 64 * 2**sub_bits counters regardless of the sample count.
+    """
+
+    def __init__(self, sub_bits=5):
+        self.sub_bits = sub_bits
+        self._sub = 1 << sub_bits
+        self.counts = [0] * (64 * self._sub)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def _index(self, value):
+        if value < 2 * self._sub: return value
+        shift = value.bit_length() - self.sub_bits - 1
+        return shift * self._sub + (value >> shift)
+
+    def bucket_bounds(self, index):
+        """Returns the [low, high] range of values counted in bucket index."""
+        if index < 2 * self._sub: return index, index
+        shift = index // self._sub - 1
+        low = (index - shift * self._sub) << shift
+        return low, low + (1 << shift) - 1
+
+    def record(self, value):
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max: self.max = value
+
+    def merge(self, other):
+        for i, c in enumerate(other.counts): self.counts[i] += c
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q):
+        """Returns the highest value equivalent to the q-th percentile (0..100), or 0 when empty."""
+        if not self.count: return 0
+        rank = max(1, -(-self.count * q // 100))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank: return min(self.bucket_bounds(i)[1], self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def buckets(self):
+        """Yields (low, high, count) for every non-empty bucket, in increasing order."""
+        for i, c in enumerate(self.counts):
+            if c:
+                low, high = self.bucket_bounds(i)
+                yield low, high, c
+
+    def summary(self):
+        result = {'count': self.count, 'mean': self.mean()}
+        for q in PERCENTILES: result[f'p{q:g}'] = self.percentile(q)
+        result['max'] = self.max
+        return result
+
+
+class LatencyRecorder:
+    """Times individual tree operations into one LatencyHistogram per (mode, operation).
+
+    attach() shadows the chosen methods on the tree instance with timing
+    wrappers and detach() removes them again, so a tree that is not attached
+    runs the plain methods with no overhead at all. Works with any backend.
+    """
+
+    def __init__(self, sub_bits=5):
+        self.sub_bits = sub_bits
+        self.histograms = {}
+        self._attached = []
+
+    def histogram(self, mode, op):
+        key = (mode, op)
+        if key not in self.histograms: self.histograms[key] = LatencyHistogram(self.sub_bits)
+        return self.histograms[key]
+
+    def attach(self, tree, ops=('insert', 'delete', 'search')):
+        for op in ops:
+            previous = tree.__dict__.get(op)
+            self._attached.append((tree, op, previous))
+            tree.__dict__[op] = self._wrap(getattr(tree, op), self.histogram(tree.mode, op).record)
+        return tree
+
+    def detach(self):
+        """Restores every method wrapped by attach()."""
+        while self._attached:
+            tree, op, previous = self._attached.pop()
+            if previous is None: tree.__dict__.pop(op, None)
+            else: tree.__dict__[op] = previous
+
+    @staticmethod
+    def _wrap(method, record, clock=time.perf_counter_ns):
+        def timed(*args):
+            start = clock()
+            result = method(*args)
+            record(clock() - start)
+            return result
+        return timed
+
+    def report(self):
+        """Returns one summary dict per (mode, operation): count, mean, p50/p90/p99/p99.9 and max in ns."""
+        return [dict(mode=mode, op=op, **hist.summary()) for (mode, op), hist in sorted(self.histograms.items())]
@@ -0,0 +1,100 @@
+import os
+import csv
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+def drop_torn_row(csv_path):
+    """Truncates a final row left without its line ending by an interrupted run."""
+    with open(csv_path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'): f.truncate(data.rfind(b'\n') + 1)
+
+
+def completed_cells(csv_path, width):
+    """Returns the set of cell keys (first `width` columns, as strings) of the complete rows in csv_path."""
+    if not os.path.exists(csv_path): return set()
+    with open(csv_path, newline='') as f:
+        rows = list(csv.reader(f))
+    return {tuple(row[:width]) for row in rows[1:] if len(row) == len(rows[0])}
+
+
+def read_header(csv_path):
+    """Returns the first row of csv_path, or None when the file is missing or empty."""
+    if not os.path.exists(csv_path): return None
+    with open(csv_path, newline='') as f:
+        return next(csv.reader(f), None)
+
+
+def run_cells(run_cell, cells, csv_path, header, workers=None, resume=False, samples_path=None, samples_header=None):
+    """Runs run_cell(cell) for every cell and streams the returned rows to csv_path as they finish.
+
+    cells are tuples whose values are also the leading columns of their row, so
+    with resume=True the cells already in the file are skipped and new rows are
+    appended; otherwise the file is rewritten. run_cell must be picklable (a
+    module-level function or a partial of one) because cells run on a
+    ProcessPoolExecutor with `workers` processes; workers=1 runs them inline.
+    With samples_path set, run_cell returns (row, sample_rows) and the sample
+    rows go to that second file, each prefixed with its cell (samples_header
+    names those columns too). On resume the samples of cells without a row,
+    left by an interrupted cell, are dropped before those cells run again.
+    Files written with other columns than header / samples_header cannot be
+    resumed: they are rewritten from scratch instead.
+    Returns the number of cells executed.
+    """
+    cells = list(cells)
+    width = len(cells[0]) if cells else 0
+    if resume and not _resumable(csv_path, header, samples_path, samples_header):
+        print(f"    not resuming: {os.path.basename(csv_path)} or its samples have other columns, rewriting them")
+        resume = False
+    if resume and os.path.exists(csv_path): drop_torn_row(csv_path)
+    done = completed_cells(csv_path, width) if resume else set()
+    pending = [cell for cell in cells if tuple(str(v) for v in cell) not in done]
+    if done: print(f"    resuming: {len(cells) - len(pending)} of {len(cells)} cells already in {os.path.basename(csv_path)}")
+
+    append = resume and os.path.exists(csv_path) and os.path.getsize(csv_path) > 0
+    samples = _open_samples(samples_path, samples_header, done, width) if samples_path else None
+    with open(csv_path, 'a' if append else 'w', newline='') as f:
+        writer = csv.writer(f)
+        if not append: writer.writerow(header)
+        f.flush()
+
+        def record(cell, result):
+            if samples:
+                result, sample_rows = result
+                samples[1].writerows(list(cell) + list(row) for row in sample_rows)
+                samples[0].flush()
+            writer.writerow(result)
+            f.flush()
+            print(f"    done {cell}")
+
+        if workers == 1:
+            for cell in pending: record(cell, run_cell(cell))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(run_cell, cell): cell for cell in pending}
+                for future in as_completed(futures): record(futures[future], future.result())
+    if samples: samples[0].close()
+    return len(pending)
+
+
+def _resumable(csv_path, header, samples_path, samples_header):
+    """Whether csv_path, and the samples file of its cells, were written with the expected columns."""
+    found = read_header(csv_path)
+    if found is None: return True
+    if found != header: return False
+    return not samples_path or read_header(samples_path) == samples_header
+
+
+def _open_samples(path, header, done, width):
+    """Rewrites the samples file keeping only the rows of the cells in done, and returns (file, writer) to append to it."""
+    rows = []
+    if done and os.path.exists(path):
+        drop_torn_row(path)
+        with open(path, newline='') as f:
+            rows = [row for row in list(csv.reader(f))[1:] if tuple(row[:width]) in done]
+    f = open(path, 'w', newline='')
+    writer = csv.writer(f)
+    writer.writerow(header)
+    writer.writerows(rows)
+    f.flush()
+    return f, writer
@@ -0,0 +1,102 @@
+import sys
+import os
+import csv
+import time
+import random
+import threading
+from contextlib import contextmanager
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from avl_tree import AVLTree
+from concurrent_avl import ConcurrentAVLTree
+
+# --- CONFIGURATION ---
+TREE_SIZE = 100000
+READER_COUNTS = [1, 2, 4, 8]
+DURATION_S = 5.0
+WRITE_BATCH = 100
+REPETITIONS = 3
+LOCKS = ['GlobalLock', 'RWLock']
+
+class GlobalLock:
+    """Baseline: one mutex shared by readers and writers"""
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def read(self):
+        with self._lock: yield
+
+    write = read
+
+def build_index(lock_name, pool):
+    index = ConcurrentAVLTree(AVLTree.from_sorted(pool[:TREE_SIZE], 'optimized'))
+    if lock_name == 'GlobalLock': index.lock = GlobalLock()
+    return index
+
+def writer_loop(index, pool, stop, counter):
+    """Long-running churn (delete + insert pairs), committed in atomic batches"""
+    k = 0
+    while not stop.is_set():
+        deletes, inserts = [], []
+        for _ in range(WRITE_BATCH):
+            rem = pool[k % TREE_SIZE]
+            add = pool[(k + TREE_SIZE) % len(pool)]
+            deletes.append(rem)
+            inserts.append(add)
+            pool[k % TREE_SIZE] = add
+            k += 1
+        index.apply_batch(deletes, inserts)
+        counter[0] += WRITE_BATCH
+
+def reader_loop(index, keys, stop, counts, slot):
+    rnd = random.Random(slot)
+    n = 0
+    while not stop.is_set():
+        index.search(keys[rnd.randrange(len(keys))])
+        n += 1
+    counts[slot] = n
+
+def run_point(lock_name, readers, seed):
+    pool = list(range(TREE_SIZE * 2))
+    random.Random(seed).shuffle(pool)
+    index = build_index(lock_name, pool)
+    search_keys = pool[:]
+
+    stop = threading.Event()
+    writes = [0]
+    counts = [0] * readers
+    threads = [threading.Thread(target=writer_loop, args=(index, pool, stop, writes))]
+    threads += [threading.Thread(target=reader_loop, args=(index, search_keys, stop, counts, i)) for i in range(readers)]
+
+    start = time.perf_counter()
+    for t in threads: t.start()
+    time.sleep(DURATION_S)
+    stop.set()
+    for t in threads: t.join()
+    elapsed = time.perf_counter() - start
+    return sum(counts) / elapsed, writes[0] / elapsed
+
+def main():
+    data_dir = os.path.join(os.path.dirname(__file__), '../../data')
+    if not os.path.exists(data_dir): os.makedirs(data_dir)
+    csv_path = os.path.join(data_dir, 'results_concurrency.csv')
+
+    print(f"--- CONCURRENCY BENCHMARK: READ THROUGHPUT UNDER WRITE LOAD ---")
+    print(f"Config: N={TREE_SIZE}, Readers={READER_COUNTS}, Duration={DURATION_S}s, Write batch={WRITE_BATCH}")
+
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Lock', 'Readers', 'Repetition', 'Read_Ops_per_s', 'Write_Ops_per_s'])
+
+        for readers in READER_COUNTS:
+            for lock_name in LOCKS:
+                for rep in range(1, REPETITIONS + 1):
+                    reads, writes = run_point(lock_name, readers, seed=rep)
+                    writer.writerow([lock_name, readers, rep, reads, writes])
+                    print(f"    [{lock_name}] readers={readers} rep={rep}: {reads:,.0f} reads/s, {writes:,.0f} writes/s")
+
+    print(f"\nConcurrency Benchmark Completed. Data saved to {csv_path}")
+
+if __name__ == '__main__':
+    main()
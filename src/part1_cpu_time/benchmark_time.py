@@ -4,6 +4,7 @@ import time
 import csv
 import random
 import statistics
+import argparse
 
 SIZES = [10000] 
 
@@ -11,15 +12,19 @@ REPETITIONS = 5
 
 SCENARIOS = ['Random', 'Sorted', 'SteadyState']
 METHODS = ['Standard', 'Optimized']
+BACKEND = 'object'
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 try:
-    from avl_tree import AVLTree
+    from avl_array import BACKENDS
 except ImportError:
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
-    from avl_tree import AVLTree
+    from avl_array import BACKENDS
+from harness import standard_workloads
+from latency import LatencyRecorder
 
-def run_comprehensive_benchmark():
+def run_comprehensive_benchmark(backend=BACKEND):
+    tree_cls = BACKENDS[backend]
     data_dir = os.path.join(os.path.dirname(__file__), '../../data')
     if not os.path.exists(data_dir): os.makedirs(data_dir)
     
@@ -28,7 +33,8 @@ def run_comprehensive_benchmark():
     print(f"--- INICIANDO BENCHMARK COMPLETO DE REMOÇÃO ---")
     print(f"Sizes: {SIZES}")
     print(f"Scenarios: {SCENARIOS}")
-    print(f"Repetitions: {REPETITIONS}\n")
+    print(f"Repetitions: {REPETITIONS}")
+    print(f"Backend: {backend}\n")
     
     with open(csv_path, 'w', newline='') as f:
         writer = csv.writer(f)
@@ -48,7 +54,7 @@ def run_comprehensive_benchmark():
                     for r in range(1, REPETITIONS + 1):
                         current_pool = master_pool[:]
                         
-                        avl = AVLTree(method.lower())
+                        avl = tree_cls(method.lower())
                         
                         if scenario == 'Sorted':
                             warmup_data = list(range(n))
@@ -113,5 +119,50 @@ def run_comprehensive_benchmark():
 
     print(f"\nBenchmark Concluído. Dados salvos em: {csv_path}")
 
+def run_latency_histograms(backend=BACKEND):
+    """Per-operation latency distributions for the same scenarios, recorded in a separate pass
+    so the per-call timers do not inflate the Deletion_Time_ms totals above"""
+    tree_cls = BACKENDS[backend]
+    data_dir = os.path.join(os.path.dirname(__file__), '../../data')
+    summary_path = os.path.join(data_dir, 'results_latency.csv')
+    hist_path = os.path.join(data_dir, 'results_latency_hist.csv')
+    print(f"\n--- HISTOGRAMAS DE LATÊNCIA POR OPERAÇÃO ---")
+
+    with open(summary_path, 'w', newline='') as fs, open(hist_path, 'w', newline='') as fh:
+        summary_writer = csv.writer(fs)
+        hist_writer = csv.writer(fh)
+        summary_writer.writerow(['Size', 'Scenario', 'Method', 'Operation', 'Count', 'Mean_ns',
+                                 'P50_ns', 'P90_ns', 'P99_ns', 'P99.9_ns', 'Max_ns'])
+        hist_writer.writerow(['Size', 'Scenario', 'Method', 'Operation', 'Low_ns', 'High_ns', 'Count'])
+
+        for n in SIZES:
+            for workload in standard_workloads(n):
+                if workload.name not in SCENARIOS: continue
+                for method in METHODS:
+                    recorder = LatencyRecorder()
+                    for r in range(1, REPETITIONS + 1):
+                        setup, stream = workload.generate(r)
+                        avl = tree_cls(method.lower())
+                        for x in setup: avl.insert(x)
+                        recorder.attach(avl, ('insert', 'delete'))
+                        for op, key in stream: getattr(avl, op)(key)
+                        recorder.detach()
+
+                    for (mode, op), hist in sorted(recorder.histograms.items()):
+                        if not hist.count: continue
+                        s = hist.summary()
+                        summary_writer.writerow([n, workload.name, method, op, s['count'], s['mean'],
+                                                 s['p50'], s['p90'], s['p99'], s['p99.9'], s['max']])
+                        for low, high, count in hist.buckets():
+                            hist_writer.writerow([n, workload.name, method, op, low, high, count])
+                        print(f"  > {workload.name} [{method}] {op}: p50={s['p50']}ns p99={s['p99']}ns "
+                              f"p99.9={s['p99.9']}ns max={s['max']}ns")
+
+    print(f"Latências salvas em: {summary_path}")
+
 if __name__ == '__main__':
-    run_comprehensive_benchmark()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--backend', choices=list(BACKENDS), default=BACKEND)
+    backend = parser.parse_args().backend
+    run_comprehensive_benchmark(backend)
+    run_latency_histograms(backend)
\ No newline at end of file
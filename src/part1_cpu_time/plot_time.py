@@ -65,5 +65,89 @@ def plot_10k_analysis():
     plt.savefig(save_path, dpi=600)
     print(f"Gráfico salvo com sucesso em: {save_path}")
 
+def plot_harness_summary():
+    """Median ns/op per workload with 95% CI bars, from src/harness.py's summary CSV"""
+    data_path = os.path.join(os.path.dirname(__file__), '../../data/results_harness_summary.csv')
+    out_dir = os.path.join(os.path.dirname(__file__), '../../analysis/cpu_time')
+    if not os.path.exists(data_path):
+        print("Aviso: results_harness_summary.csv não encontrado; rode src/harness.py para gerar.")
+        return
+    if not os.path.exists(out_dir): os.makedirs(out_dir)
+
+    df = pd.read_csv(data_path)
+    df = df[(df['Metric'] == 'ns_per_op') & (df['Backend'] == df['Backend'].iloc[0])]
+    n = df['Size'].max()
+    df = df[df['Size'] == n]
+
+    sns.set_theme(style="white")
+    workloads = list(dict.fromkeys(df['Workload']))
+    methods = ['Standard', 'Optimized']
+    cores_personalizadas = {"Standard": "#f03a53", "Optimized": "#0bafee"}
+    width = 0.35
+
+    plt.figure(figsize=(9, 6))
+    for i, method in enumerate(methods):
+        dm = df[df['Method'] == method].set_index('Workload').reindex(workloads)
+        xs = [x + (i - 0.5) * width for x in range(len(workloads))]
+        err = [dm['Median'] - dm['CI95_Low'], dm['CI95_High'] - dm['Median']]
+        plt.bar(xs, dm['Median'], width=width, color=cores_personalizadas[method], label=method,
+                yerr=[[max(e, 0) for e in side] for side in err], capsize=4)
+
+    plt.xticks(range(len(workloads)), workloads)
+    plt.ylabel('Time per Operation (ns, median)', fontsize=11)
+    plt.title(f'Harness Workloads (N={n})')
+    plt.legend(frameon=False)
+    sns.despine()
+    plt.tight_layout()
+    save_path = os.path.join(out_dir, 'harness_workloads.png')
+    plt.savefig(save_path, dpi=600)
+    print(f"Gráfico salvo com sucesso em: {save_path}")
+
+def plot_latency_distributions():
+    """Latency tail (share of operations slower than t, log-log) per scenario, one line per method"""
+    summary_path = os.path.join(os.path.dirname(__file__), '../../data/results_latency.csv')
+    hist_path = os.path.join(os.path.dirname(__file__), '../../data/results_latency_hist.csv')
+    out_dir = os.path.join(os.path.dirname(__file__), '../../analysis/cpu_time')
+    if not os.path.exists(hist_path):
+        print("Aviso: results_latency_hist.csv não encontrado; rode benchmark_time.py para gerar.")
+        return
+    if not os.path.exists(out_dir): os.makedirs(out_dir)
+
+    hist = pd.read_csv(hist_path)
+    summary = pd.read_csv(summary_path)
+    n = hist['Size'].max()
+    hist = hist[hist['Size'] == n]
+    summary = summary[summary['Size'] == n]
+    cores_personalizadas = {"Standard": "#f03a53", "Optimized": "#0bafee"}
+
+    sns.set_theme(style="white")
+    for op, df_op in hist.groupby('Operation'):
+        scenarios = list(dict.fromkeys(df_op['Scenario']))
+        fig, axes = plt.subplots(1, len(scenarios), figsize=(5 * len(scenarios), 4.5), sharey=True, squeeze=False)
+        for ax, scenario in zip(axes[0], scenarios):
+            for method, color in cores_personalizadas.items():
+                d = df_op[(df_op['Scenario'] == scenario) & (df_op['Method'] == method)].sort_values('High_ns')
+                if d.empty: continue
+                # fraction of operations that took longer than each bucket's upper edge
+                tail = 1 - d['Count'].cumsum() / d['Count'].sum()
+                ax.step(d['High_ns'], tail.clip(lower=1e-6), where='post', color=color, label=method)
+                p99 = summary[(summary['Scenario'] == scenario) & (summary['Method'] == method) &
+                              (summary['Operation'] == op)]['P99_ns']
+                if not p99.empty: ax.axvline(p99.iloc[0], color=color, linestyle=':', linewidth=1)
+            ax.set_xscale('log')
+            ax.set_yscale('log')
+            ax.set_title(scenario)
+            ax.set_xlabel(f'{op} latency (ns)')
+        axes[0][0].set_ylabel('Fraction of ops slower (dotted: p99)')
+        axes[0][0].legend(frameon=False)
+        sns.despine()
+        plt.tight_layout()
+        save_path = os.path.join(out_dir, f'latency_tail_{op}.png')
+        plt.savefig(save_path, dpi=300)
+        plt.close(fig)
+        print(f"Gráfico salvo com sucesso em: {save_path}")
+
 if __name__ == '__main__':
-    plot_10k_analysis()
\ No newline at end of file
+    plot_10k_analysis()
+    plot_harness_summary()
+    plot_latency_distributions()
\ No newline at end of file
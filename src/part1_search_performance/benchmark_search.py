@@ -3,39 +3,72 @@ import os
 import time
 import csv
 import random
+import argparse
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from avl_tree import AVLTree
+from avl_array import BACKENDS
+from avl_layout import import_numpy
 
 TREE_SIZE = 100000 
 LONG_RUN_OPS = 500000
 SEARCH_OPS = 1000000
 REPETITIONS = 5  
+BACKEND = 'object'
+NEAR_SORTED_WINDOW = 16
+SEED = 2024
 
-def run_unified_benchmark():
+def time_queries(search, queries, rounds):
+    """Returns the mean ns per call of search over rounds passes of queries."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for k in queries:
+            search(k)
+    return (time.perf_counter() - start) * 1e9 / (rounds * len(queries))
+
+def measure_streams(tree, search_keys, rounds, rng):
+    """Root-restart vs finger search ns/op on a sorted and a near-sorted (locally shuffled with rng) query stream."""
+    sorted_keys = sorted(search_keys)
+    near_sorted = sorted_keys[:]
+    for i in range(0, len(near_sorted), NEAR_SORTED_WINDOW):
+        window = near_sorted[i:i + NEAR_SORTED_WINDOW]
+        rng.shuffle(window)
+        near_sorted[i:i + NEAR_SORTED_WINDOW] = window
+    results = []
+    for queries in (sorted_keys, near_sorted):
+        results.append(time_queries(tree.search, queries, rounds))
+        # ArrayAVLTree has no finger search
+        results.append(time_queries(tree.locate(queries[0]).search, queries, rounds) if hasattr(tree, 'locate') else float('nan'))
+    return results
+
+def run_unified_benchmark(backend=BACKEND, seed=SEED):
+    tree_cls = BACKENDS[backend]
+    np = import_numpy()
     data_dir = os.path.join(os.path.dirname(__file__), '../../data')
     if not os.path.exists(data_dir): os.makedirs(data_dir)
     csv_path = os.path.join(data_dir, 'results_unified_search.csv')
 
     print(f"--- BENCHMARK UNIFICADO: LONG RUNNING + BUSCA + TOPOLOGIA ---")
-    print(f"Config: N={TREE_SIZE}, Stress={LONG_RUN_OPS}, Search={SEARCH_OPS}")
+    print(f"Config: N={TREE_SIZE}, Stress={LONG_RUN_OPS}, Search={SEARCH_OPS}, Backend={backend}, Seed={seed}")
     
     with open(csv_path, 'w', newline='') as f:
         writer = csv.writer(f)
         writer.writerow([
             'Method', 'Repetition', 
             'Final_Height', 'Avg_Depth', 
-            'Total_Search_Time_ms', 'Avg_Search_Time_ns'
+            'Total_Search_Time_ms', 'Avg_Search_Time_ns', 'Frozen_Search_Time_ns',
+            'Batch_Search_Time_ns', 'Measured_Avg_Depth',
+            'Sorted_Root_ns', 'Sorted_Finger_ns', 'NearSorted_Root_ns', 'NearSorted_Finger_ns'
         ])
 
         for r in range(1, REPETITIONS + 1):
             print(f"\n>>> Rodada {r}/{REPETITIONS}")
             
+            rng = random.Random(f"{seed}:{r}")
             pool = list(range(TREE_SIZE * 2))
-            random.shuffle(pool)
+            rng.shuffle(pool)
             
             print("   [Standard] 1. Construindo e Estressando...", end='\r')
-            avl_std = AVLTree('standard')
+            avl_std = tree_cls('standard')
             
             for i in range(TREE_SIZE): avl_std.insert(pool[i])
             
@@ -60,16 +93,34 @@ def run_unified_benchmark():
             
             time_std_ms = (end - start) * 1000
             time_std_ns = (time_std_ms * 1e6) / SEARCH_OPS
+
+            frozen = avl_std.freeze()
+            start = time.perf_counter()
+            for _ in range(SEARCH_OPS // TREE_SIZE):
+                for k in search_keys:
+                    frozen.search(k)
+            end = time.perf_counter()
+            frozen_std_ns = (end - start) * 1e9 / SEARCH_OPS
+
+            queries = np.tile(np.array(search_keys), SEARCH_OPS // TREE_SIZE)
+            start = time.perf_counter()
+            found, _, depths = avl_std.search_batch(queries, details=True)
+            end = time.perf_counter()
+            batch_std_ns = (end - start) * 1e9 / SEARCH_OPS
+            measured_std = depths[found].mean()
+
+            streams_std = measure_streams(avl_std, search_keys, SEARCH_OPS // TREE_SIZE, rng)
             
-            writer.writerow(['Standard', r, h_std, depth_std, time_std_ms, time_std_ns])
-            print(f"   [Standard] Concluído: H={h_std}, Depth={depth_std:.3f}, Time={time_std_ns:.1f}ns")
+            writer.writerow(['Standard', r, h_std, depth_std, time_std_ms, time_std_ns, frozen_std_ns, batch_std_ns, measured_std] + streams_std)
+            print(f"   [Standard] Concluído: H={h_std}, Depth={depth_std:.3f} (medida {measured_std:.3f}), Time={time_std_ns:.1f}ns, Frozen={frozen_std_ns:.1f}ns, Batch={batch_std_ns:.1f}ns")
+            print(f"   [Standard] Ordenada: raiz={streams_std[0]:.1f}ns, finger={streams_std[1]:.1f}ns | Quase ordenada: raiz={streams_std[2]:.1f}ns, finger={streams_std[3]:.1f}ns")
             
             del avl_std
 
-            random.shuffle(pool)
+            rng.shuffle(pool)
             
             print("   [Optimized] 1. Construindo e Estressando...", end='\r')
-            avl_opt = AVLTree('optimized')
+            avl_opt = tree_cls('optimized')
             
 
             for i in range(TREE_SIZE): avl_opt.insert(pool[i])
@@ -95,13 +146,35 @@ def run_unified_benchmark():
             
             time_opt_ms = (end - start) * 1000
             time_opt_ns = (time_opt_ms * 1e6) / SEARCH_OPS
+
+            frozen = avl_opt.freeze()
+            start = time.perf_counter()
+            for _ in range(SEARCH_OPS // TREE_SIZE):
+                for k in search_keys:
+                    frozen.search(k)
+            end = time.perf_counter()
+            frozen_opt_ns = (end - start) * 1e9 / SEARCH_OPS
+
+            queries = np.tile(np.array(search_keys), SEARCH_OPS // TREE_SIZE)
+            start = time.perf_counter()
+            found, _, depths = avl_opt.search_batch(queries, details=True)
+            end = time.perf_counter()
+            batch_opt_ns = (end - start) * 1e9 / SEARCH_OPS
+            measured_opt = depths[found].mean()
+
+            streams_opt = measure_streams(avl_opt, search_keys, SEARCH_OPS // TREE_SIZE, rng)
             
-            writer.writerow(['Optimized', r, h_opt, depth_opt, time_opt_ms, time_opt_ns])
-            print(f"   [Optimized] Concluído: H={h_opt}, Depth={depth_opt:.3f}, Time={time_opt_ns:.1f}ns")
+            writer.writerow(['Optimized', r, h_opt, depth_opt, time_opt_ms, time_opt_ns, frozen_opt_ns, batch_opt_ns, measured_opt] + streams_opt)
+            print(f"   [Optimized] Concluído: H={h_opt}, Depth={depth_opt:.3f} (medida {measured_opt:.3f}), Time={time_opt_ns:.1f}ns, Frozen={frozen_opt_ns:.1f}ns, Batch={batch_opt_ns:.1f}ns")
+            print(f"   [Optimized] Ordenada: raiz={streams_opt[0]:.1f}ns, finger={streams_opt[1]:.1f}ns | Quase ordenada: raiz={streams_opt[2]:.1f}ns, finger={streams_opt[3]:.1f}ns")
             
             del avl_opt
 
     print(f"\nBenchmark Unificado Concluído. Dados em: {csv_path}")
 
 if __name__ == '__main__':
-    run_unified_benchmark()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--backend', choices=list(BACKENDS), default=BACKEND)
+    parser.add_argument('--seed', type=int, default=SEED, help='base seed; repetition r shuffles with seed:r (the Standard build matches loadgen_server)')
+    args = parser.parse_args()
+    run_unified_benchmark(args.backend, args.seed)
\ No newline at end of file
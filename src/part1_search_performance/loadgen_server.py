@@ -0,0 +1,129 @@
+import sys
+import os
+import csv
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import multiprocessing
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from avl_server import AVLServer, AVLClient
+from latency import LatencyHistogram
+from benchmark_search import TREE_SIZE, LONG_RUN_OPS, SEARCH_OPS
+
+# --- CONFIGURATION ---
+REPETITIONS = 3
+CONNECTIONS = 4  # client pool size
+PIPELINE_DEPTHS = [1, 16, 128]  # requests in flight per connection
+METHODS = ['Standard', 'Optimized']
+SEED = 2024
+
+def serve(address, mode):
+    """Server process: one AVLServer on address until terminated"""
+    async def run():
+        server = AVLServer(mode=mode)
+        await server.start(address)
+        await server.serve_forever()
+    asyncio.run(run())
+
+def start_server(address, mode):
+    process = multiprocessing.Process(target=serve, args=(address, mode), daemon=True)
+    process.start()
+    deadline = time.monotonic() + 10
+    while not os.path.exists(address):
+        if time.monotonic() > deadline or not process.is_alive(): raise RuntimeError("AVL server did not start")
+        time.sleep(0.01)
+    return process
+
+async def drive(client, requests, concurrency):
+    """Closed loop: `concurrency` coroutines each send their next request once the previous one answered.
+
+    Returns (seconds, LatencyHistogram of per-request round trips in ns).
+    """
+    hist = LatencyHistogram()
+    requests = iter(requests)
+    clock = time.perf_counter_ns
+
+    async def worker():
+        for request in requests:
+            start = clock()
+            await client.call(*request)
+            hist.record(clock() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start, hist
+
+def stress_requests(pool):
+    """benchmark_search's stress phase: LONG_RUN_OPS delete+insert pairs over a window of TREE_SIZE live keys"""
+    for k in range(LONG_RUN_OPS):
+        rem = pool[k % TREE_SIZE]
+        add = pool[(k + TREE_SIZE) % len(pool)]
+        yield ('delete', rem)
+        yield ('put', add)
+        pool[k % TREE_SIZE] = add
+
+async def run_workload(address, depth, seed):
+    """Build, stress and search phases of the benchmark_search workload, replayed over the socket"""
+    pool = list(range(TREE_SIZE * 2))
+    random.Random(seed).shuffle(pool)
+    results = []
+    async with AVLClient(address, pool_size=CONNECTIONS) as client:
+        concurrency = CONNECTIONS * depth
+        phases = [('Build', (('put', key) for key in pool[:TREE_SIZE]), TREE_SIZE),
+                  ('Stress', stress_requests(pool), 2 * LONG_RUN_OPS)]
+        for phase, requests, count in phases:
+            seconds, hist = await drive(client, requests, concurrency)
+            results.append((phase, count, seconds, hist))
+        search_keys = pool[:TREE_SIZE]
+        searches = (('get', search_keys[i % TREE_SIZE]) for i in range(SEARCH_OPS))
+        seconds, hist = await drive(client, searches, concurrency)
+        results.append(('Search', SEARCH_OPS, seconds, hist))
+        missing = sum(1 for found in await asyncio.gather(*(client.get(k) for k in search_keys[:1000])) if found is None)
+        if missing: raise RuntimeError(f"{missing} of the live keys are missing on the server")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Replays the benchmark_search workload against avl_server over a Unix socket')
+    parser.add_argument('--depths', type=int, nargs='+', default=PIPELINE_DEPTHS, help='requests in flight per connection')
+    parser.add_argument('--repetitions', type=int, default=REPETITIONS)
+    parser.add_argument('--seed', type=int, default=SEED, help='base seed; repetition r replays the key order of seed:r')
+    args = parser.parse_args()
+
+    data_dir = os.path.join(os.path.dirname(__file__), '../../data')
+    if not os.path.exists(data_dir): os.makedirs(data_dir)
+    csv_path = os.path.join(data_dir, 'results_server.csv')
+    address = os.path.join(tempfile.mkdtemp(prefix='avl-server-'), 'avl.sock')
+
+    print(f"--- SOCKET LOAD GENERATOR: benchmark_search WORKLOAD OVER avl_server ---")
+    print(f"Config: N={TREE_SIZE}, Stress={LONG_RUN_OPS} pairs, Search={SEARCH_OPS}, "
+          f"{CONNECTIONS} connections, depths={args.depths}")
+
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Method', 'Pipeline_Depth', 'Connections', 'Repetition', 'Phase', 'Requests',
+                         'Req_Per_Sec', 'Mean_us', 'P50_us', 'P99_us', 'P99_9_us', 'Max_us'])
+        for method in METHODS:
+            for depth in args.depths:
+                for rep in range(1, args.repetitions + 1):
+                    server = start_server(address, method.lower())
+                    try:
+                        results = asyncio.run(run_workload(address, depth, f"{args.seed}:{rep}"))
+                    finally:
+                        server.terminate()
+                        server.join()
+                        if os.path.exists(address): os.remove(address)
+                    for phase, count, seconds, hist in results:
+                        s = hist.summary()
+                        writer.writerow([method, depth, CONNECTIONS, rep, phase, count, count / seconds,
+                                         s['mean'] / 1e3, s['p50'] / 1e3, s['p99'] / 1e3, s['p99.9'] / 1e3, s['max'] / 1e3])
+                        print(f"    [{method} depth={depth} rep={rep}] {phase}: {count / seconds:,.0f} req/s, "
+                              f"p99 {s['p99'] / 1e3:.0f} us")
+                    f.flush()
+
+    print(f"\nLoad Generation Completed. Data saved to {csv_path}")
+
+if __name__ == '__main__':
+    main()
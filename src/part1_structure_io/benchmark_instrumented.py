@@ -0,0 +1,54 @@
+import sys
+import os
+import csv
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from avl_tree import AVLTree
+from harness import standard_workloads
+from instrumentation import Instrumentation, ROTATION_CASES
+
+# --- CONFIGURATION ---
+SIZE = 100000
+REPETITIONS = 3
+SCENARIOS = ['Random', 'Sorted', 'SteadyState']
+METHODS = ['Standard', 'Optimized']
+
+def run_instrumented(workload, method, rep):
+    """Replays one workload stream with the counters attached, then searches every setup key once"""
+    setup, stream = workload.generate(rep)
+    avl = AVLTree(method.lower())
+    for key in setup: avl.insert(key)
+    probe = Instrumentation()
+    probe.attach(avl)
+    for op, key in stream: getattr(avl, op)(key)
+    for key in setup: avl.search(key)
+    probe.detach()
+    return probe.snapshot()
+
+def main():
+    data_dir = os.path.join(os.path.dirname(__file__), '../../data')
+    if not os.path.exists(data_dir): os.makedirs(data_dir)
+    csv_path = os.path.join(data_dir, 'results_instrumentation.csv')
+
+    print(f"--- INSTRUMENTED RUNS: ROTATION CASES, RETRACE LENGTH, REPLACEMENT SIDE ---")
+    print(f"Config: N={SIZE}, Scenarios={SCENARIOS}, Reps={REPETITIONS}")
+
+    columns = ['rotations_' + case for case in ROTATION_CASES] + [
+        'retraces', 'avg_retrace_length', 'replacement_predecessor', 'replacement_successor', 'avg_search_visits']
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Scenario', 'Method', 'Repetition'] + columns)
+        for workload in standard_workloads(SIZE):
+            if workload.name not in SCENARIOS: continue
+            for method in METHODS:
+                for rep in range(1, REPETITIONS + 1):
+                    c = run_instrumented(workload, method, rep)
+                    writer.writerow([workload.name, method, rep] + [c[col] for col in columns])
+                    print(f"    [{workload.name}/{method}] rep={rep}: "
+                          f"LL/RR/LR/RL={'/'.join(str(c['rotations_' + k]) for k in ROTATION_CASES)}, "
+                          f"retrace={c['avg_retrace_length']:.2f}, pred/succ={c['replacement_predecessor']}/{c['replacement_successor']}")
+
+    print(f"\nInstrumentation Completed. Data saved to {csv_path}")
+
+if __name__ == '__main__':
+    main()
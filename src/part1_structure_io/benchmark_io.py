@@ -1,108 +1,226 @@
 import sys
 import os
 import csv
+import time
 import random
+import argparse
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from avl_tree import AVLTree
+from avl_array import BACKENDS
+from parallel_runner import run_cells
+from replacement import STRATEGIES
+from relaxed_avl import RelaxedAVLTree
+from harness import Workload
 
 # --- CONFIGURATION ---
 SIZES = [1000, 10000, 100000, 1000000]
 REPETITIONS = 5
 LONG_RUN_SIZE = 100000 
 LONG_RUN_OPS = 1000000 
+SHAPE_SAMPLE_EVERY = 10000  # long-running ops between shape samples (average depth, height)
+BACKEND = 'object'
+BULK_LOAD = True  # build the Sorted trees with from_sorted() instead of n sequential inserts
+METHODS = ['Standard', 'Optimized']
+SEED = 2024
+STRATEGY_SIZE = 100000  # tree size of the Random/Sorted cells of the replacement-strategy sweep
+BALANCE_VARIANTS = ['Standard', 'Optimized', 'Relaxed', 'Relaxed_Budget']
+RELAXED_BUDGET = 64  # rotations per rebalance(budget) call of Relaxed_Budget...
+RELAXED_EVERY = 1000  # ...made every RELAXED_EVERY long-running ops, as an idle-time task would
 
-def run_scaling_tests(writer):
-    """Runs Random and Sorted scenarios across different sizes"""
+def build_sorted(tree_cls, mode, n):
+    """Builds the tree for the Sorted scenario over keys 0..n-1"""
+    if BULK_LOAD: return tree_cls.from_sorted(range(n), mode)
+    avl = tree_cls(mode)
+    for i in range(n): avl.insert(i)
+    return avl
+
+def scaling_cells(backend):
+    """One cell per (backend, scenario, size, repetition, method) of the Random and Sorted scaling suite"""
     for n in SIZES:
-        print(f"--> Testing Structure Scaling N={n}...")
-        base_data = list(range(n))
-        
         for rep in range(1, REPETITIONS + 1):
-            random.shuffle(base_data)
-            to_delete = base_data[:n//2]
-            
-            avl = AVLTree('standard')
-            for x in base_data: avl.insert(x)
-            avl.reset_stats()
-            for x in to_delete: avl.delete(x)
-            writer.writerow(['Random', n, rep, 'Standard', avl.stats['rotations'], avl.get_height(avl.root)])
-
-            avl = AVLTree('optimized')
-            for x in base_data: avl.insert(x)
-            avl.reset_stats()
-            for x in to_delete: avl.delete(x)
-            writer.writerow(['Random', n, rep, 'Optimized', avl.stats['rotations'], avl.get_height(avl.root)])
-
-            avl = AVLTree('standard')
-            for i in range(n): avl.insert(i) 
-            avl.reset_stats()
-            for x in to_delete: avl.delete(x) 
-            writer.writerow(['Sorted', n, rep, 'Standard', avl.stats['rotations'], avl.get_height(avl.root)])
-            
-   
-            avl = AVLTree('optimized')
-            for i in range(n): avl.insert(i)
-            avl.reset_stats()
-            for x in to_delete: avl.delete(x)
-            writer.writerow(['Sorted', n, rep, 'Optimized', avl.stats['rotations'], avl.get_height(avl.root)])
-
-def run_long_running(writer):
-    """Runs the database simulation"""
-    print(f"--> Running Long-Running Simulation (1M Ops) x {REPETITIONS} reps...")
-    
+            for scenario in ['Random', 'Sorted']:
+                for method in METHODS:
+                    yield (backend, scenario, n, rep, method)
+
+def long_running_cells(backend):
     for rep in range(1, REPETITIONS + 1):
-        print(f"    ... Repetition {rep}/{REPETITIONS}")
-        
+        for method in METHODS:
+            yield (backend, 'Long_Running', LONG_RUN_SIZE, rep, method)
 
-        pool = list(range(LONG_RUN_SIZE * 2))
-        random.shuffle(pool)
-        
-        avl = AVLTree('standard')
+def strategy_cells(backend, strategies):
+    """One cell per (backend, scenario, size, repetition, strategy) of the replacement-strategy sweep"""
+    for rep in range(1, REPETITIONS + 1):
+        for strategy in strategies:
+            yield (backend, 'Random', STRATEGY_SIZE, rep, strategy)
+            yield (backend, 'Sorted', STRATEGY_SIZE, rep, strategy)
+            yield (backend, 'Long_Running', LONG_RUN_SIZE, rep, strategy)
 
-        for i in range(LONG_RUN_SIZE): avl.insert(pool[i])
-        avl.reset_stats()
-        
+def relaxed_cells():
+    for rep in range(1, REPETITIONS + 1):
+        for variant in BALANCE_VARIANTS:
+            yield ('Long_Running', LONG_RUN_SIZE, rep, variant)
 
-        for k in range(LONG_RUN_OPS):
-            rem = pool[k % LONG_RUN_SIZE]
-            add = pool[(k + LONG_RUN_SIZE) % len(pool)]
-            avl.delete(rem)
-            avl.insert(add)
-            pool[k % LONG_RUN_SIZE] = add
-            
-        writer.writerow(['Long_Running', LONG_RUN_SIZE, rep, 'Standard', avl.stats['rotations'], avl.get_height(avl.root)])
-        
-        pool = list(range(LONG_RUN_SIZE * 2)) 
-        random.shuffle(pool)
+def cell_rng(n, rep):
+    """Deterministic per-cell RNG; both methods (and both scaling scenarios) of a (size, rep) see the same data"""
+    return random.Random(f"{SEED}:{n}:{rep}")
 
-        avl = AVLTree('optimized')
-        
-        for i in range(LONG_RUN_SIZE): avl.insert(pool[i])
-        avl.reset_stats()
-        
-        for k in range(LONG_RUN_OPS):
-            rem = pool[k % LONG_RUN_SIZE]
-            add = pool[(k + LONG_RUN_SIZE) % len(pool)]
+def run_scaling_cell(tree_cls, scenario, n, rep, method, strategy=None):
+    """Random: n shuffled inserts, Sorted: keys 0..n-1; then half the keys are deleted in shuffled order"""
+    base_data = list(range(n))
+    cell_rng(n, rep).shuffle(base_data)
+    to_delete = base_data[:n//2]
+
+    if scenario == 'Random':
+        avl = tree_cls(method.lower())
+        for x in base_data: avl.insert(x)
+    else:
+        avl = build_sorted(tree_cls, method.lower(), n)
+    avl.reset_stats()
+    if strategy: avl.use_replacement(strategy)
+    for x in to_delete: avl.delete(x)
+    return avl.stats['rotations'], avl.get_height(avl.root)
+
+def run_long_running_cell(tree_cls, n, rep, method, strategy=None):
+    """The database simulation: LONG_RUN_OPS delete+insert pairs over a tree of n keys.
+
+    Every SHAPE_SAMPLE_EVERY ops the average depth and height are sampled; the
+    object backend keeps subtree sizes so each sample is O(1).
+    """
+    pool = list(range(n * 2))
+    cell_rng(n, rep).shuffle(pool)
+
+    avl = tree_cls(method.lower(), order_stats=True) if tree_cls is BACKENDS['object'] else tree_cls(method.lower())
+    for i in range(n): avl.insert(pool[i])
+    avl.reset_stats()
+    if strategy: avl.use_replacement(strategy)
+
+    samples = [(0, avl.get_average_depth(), avl.get_height(avl.root))]
+    for k in range(LONG_RUN_OPS):
+        rem = pool[k % n]
+        add = pool[(k + n) % len(pool)]
+        avl.delete(rem)
+        avl.insert(add)
+        pool[k % n] = add
+        if (k + 1) % SHAPE_SAMPLE_EVERY == 0:
+            samples.append((k + 1, avl.get_average_depth(), avl.get_height(avl.root)))
+    return avl.stats['rotations'], avl.get_height(avl.root), samples
+
+def run_cell(cell):
+    """Runs one (backend, scenario, size, repetition, method) cell and returns its CSV row and shape samples"""
+    backend, scenario, n, rep, method = cell
+    tree_cls = BACKENDS[backend]
+    samples = []
+    if scenario == 'Long_Running': rotations, height, samples = run_long_running_cell(tree_cls, n, rep, method)
+    else: rotations, height = run_scaling_cell(tree_cls, scenario, n, rep, method)
+    return [backend, scenario, n, rep, method, rotations, height], samples
+
+def run_strategy_cell(cell):
+    """Runs one cell of the sweep with its replacement strategy attached after setup; the time covers the whole cell"""
+    backend, scenario, n, rep, strategy = cell
+    tree_cls = BACKENDS[backend]
+    start = time.perf_counter()
+    if scenario == 'Long_Running': rotations, height, _ = run_long_running_cell(tree_cls, n, rep, 'standard', strategy)
+    else: rotations, height = run_scaling_cell(tree_cls, scenario, n, rep, 'standard', strategy)
+    return [backend, scenario, n, rep, strategy, rotations, height, time.perf_counter() - start]
+
+def run_relaxed_cell(cell):
+    """Long-running churn on a strict or relaxed tree (object backend, order_stats for O(1) depth samples).
+
+    Write time and rebalance time are clocked apart: Relaxed only rebalances
+    once at the end, Relaxed_Budget every RELAXED_EVERY ops. Burst_* columns
+    describe the shape searches see during the run, Final_* the shape after
+    the closing rebalance.
+    """
+    scenario, n, rep, variant = cell
+    pool = list(range(n * 2))
+    cell_rng(n, rep).shuffle(pool)
+    if variant.startswith('Relaxed'): avl = RelaxedAVLTree('optimized', order_stats=True)
+    else: avl = BACKENDS['object'](variant.lower(), order_stats=True)
+    for i in range(n): avl.insert(pool[i])
+    avl.reset_stats()
+    rebalance = getattr(avl, 'rebalance', None)
+
+    write_time = rebalance_time = 0.0
+    depths, heights, slack = [], [], 0
+    for start in range(0, LONG_RUN_OPS, RELAXED_EVERY):
+        t0 = time.perf_counter()
+        for k in range(start, min(start + RELAXED_EVERY, LONG_RUN_OPS)):
+            rem = pool[k % n]
+            add = pool[(k + n) % len(pool)]
             avl.delete(rem)
             avl.insert(add)
-            pool[k % LONG_RUN_SIZE] = add
+            pool[k % n] = add
+        write_time += time.perf_counter() - t0
+        if variant == 'Relaxed_Budget':
+            t0 = time.perf_counter()
+            rebalance(RELAXED_BUDGET)
+            rebalance_time += time.perf_counter() - t0
+        if (k + 1) % SHAPE_SAMPLE_EVERY < RELAXED_EVERY:
+            depths.append(avl.get_average_depth())
+            heights.append(avl.get_height(avl.root))
+            if rebalance: slack = max(slack, avl.height_slack())
+    if rebalance:
+        t0 = time.perf_counter()
+        rebalance()
+        rebalance_time += time.perf_counter() - t0
+    return [scenario, n, rep, variant, 2 * LONG_RUN_OPS / write_time, rebalance_time, avl.stats['rotations'],
+            sum(depths) / len(depths), max(heights), avl.get_average_depth(), avl.get_height(avl.root), slack]
 
-        writer.writerow(['Long_Running', LONG_RUN_SIZE, rep, 'Optimized', avl.stats['rotations'], avl.get_height(avl.root)])
+def run_memory_footprint(data_dir):
+    """Compares the node storage footprint of every backend at each size, built from the harness's seeded Random keys"""
+    csv_path = os.path.join(data_dir, 'results_memory.csv')
+    print(f"--> Measuring Memory Footprint per Backend...")
+
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Size', 'Backend', 'Memory_Bytes', 'Bytes_Per_Key'])
+        for n in SIZES:
+            base_data, _ = Workload('Random', 'random', n).generate(1)
+            for backend, tree_cls in BACKENDS.items():
+                avl = tree_cls('standard')
+                for x in base_data: avl.insert(x)
+                mem = avl.get_memory_footprint()
+                writer.writerow([n, backend, mem, mem / n])
+                print(f"    N={n} [{backend}] {mem / n:.1f} bytes/key")
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--backend', choices=list(BACKENDS), default=BACKEND)
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='parallel cell processes (1 = run inline)')
+    parser.add_argument('--resume', action='store_true', help='skip cells already in results_structure.csv / results_replacement.csv')
+    parser.add_argument('--skip-relaxed', action='store_true', help='skip the strict vs relaxed rebalancing comparison')
+    parser.add_argument('--strategies', nargs='*', choices=list(STRATEGIES), default=list(STRATEGIES),
+                        help='replacement strategies to sweep (none = skip the sweep)')
+    args = parser.parse_args()
+
     data_dir = os.path.join(os.path.dirname(__file__), '../../data')
     if not os.path.exists(data_dir): os.makedirs(data_dir)
     csv_path = os.path.join(data_dir, 'results_structure.csv')
+    drift_path = os.path.join(data_dir, 'results_shape_drift.csv')
     
-    print(f"--- STARTING PHASE 2: STRUCTURE & I/O BENCHMARK ---")
+    print(f"--- STARTING PHASE 2: STRUCTURE & I/O BENCHMARK ({args.backend} backend, {args.workers} workers) ---")
 
-    with open(csv_path, 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(['Scenario', 'Size', 'Repetition', 'Method', 'Total_Rotations', 'Final_Height'])
-        
-        run_scaling_tests(writer)
-        run_long_running(writer)
+    cells = list(scaling_cells(args.backend)) + list(long_running_cells(args.backend))
+    run_cells(run_cell, cells, csv_path,
+              ['Backend', 'Scenario', 'Size', 'Repetition', 'Method', 'Total_Rotations', 'Final_Height'],
+              workers=args.workers, resume=args.resume, samples_path=drift_path,
+              samples_header=['Backend', 'Scenario', 'Size', 'Repetition', 'Method', 'Ops', 'Avg_Depth', 'Height'])
+
+    if args.strategies:
+        print(f"--> Sweeping replacement strategies: {args.strategies}")
+        run_cells(run_strategy_cell, strategy_cells(args.backend, args.strategies),
+                  os.path.join(data_dir, 'results_replacement.csv'),
+                  ['Backend', 'Scenario', 'Size', 'Repetition', 'Strategy', 'Total_Rotations', 'Final_Height', 'Seconds'],
+                  workers=args.workers, resume=args.resume)
+
+    if not args.skip_relaxed:
+        print(f"--> Comparing strict and relaxed rebalancing: {BALANCE_VARIANTS}")
+        run_cells(run_relaxed_cell, relaxed_cells(), os.path.join(data_dir, 'results_relaxed.csv'),
+                  ['Scenario', 'Size', 'Repetition', 'Variant', 'Write_Ops_Per_Sec', 'Rebalance_Seconds', 'Total_Rotations',
+                   'Burst_Avg_Depth', 'Burst_Max_Height', 'Final_Avg_Depth', 'Final_Height', 'Max_Height_Slack'],
+                  workers=args.workers, resume=args.resume)
+
+    run_memory_footprint(data_dir)
         
     print(f"\nPhase 2 Completed. Data saved to {csv_path}")
 
@@ -0,0 +1,67 @@
+import sys
+import os
+import csv
+import time
+import random
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from avl_tree import AVLTree
+from persistent_avl import PersistentAVLTree
+
+# --- CONFIGURATION ---
+LONG_RUN_SIZE = 100000
+LONG_RUN_OPS = 200000
+SNAPSHOT_EVERY = 10000
+KEEP_SNAPSHOTS = 5
+REPETITIONS = 3
+TREES = {'Mutable': AVLTree, 'Persistent': PersistentAVLTree}
+METHODS = ['Standard', 'Optimized']
+
+def run_churn(tree_cls, method, pool):
+    """Long-running delete+insert churn; the persistent tree also keeps a rolling set of snapshots"""
+    avl = tree_cls.from_sorted(pool[:LONG_RUN_SIZE], method.lower())
+    avl.reset_stats()
+    snapshots = []
+
+    start = time.perf_counter()
+    for k in range(LONG_RUN_OPS):
+        rem = pool[k % LONG_RUN_SIZE]
+        add = pool[(k + LONG_RUN_SIZE) % len(pool)]
+        avl.delete(rem)
+        avl.insert(add)
+        pool[k % LONG_RUN_SIZE] = add
+        if tree_cls is PersistentAVLTree and k % SNAPSHOT_EVERY == 0:
+            snapshots.append(avl.snapshot())
+            del snapshots[:-KEEP_SNAPSHOTS]
+    elapsed = time.perf_counter() - start
+
+    ops = 2 * LONG_RUN_OPS
+    # the mutable tree allocates exactly one Node per insert and none per delete
+    allocations = avl.stats.get('allocations', LONG_RUN_OPS)
+    return allocations, allocations / ops, elapsed * 1e6 / ops, avl.stats['rotations']
+
+def main():
+    data_dir = os.path.join(os.path.dirname(__file__), '../../data')
+    if not os.path.exists(data_dir): os.makedirs(data_dir)
+    csv_path = os.path.join(data_dir, 'results_persistent.csv')
+
+    print(f"--- PERSISTENT vs MUTABLE: NODE ALLOCATION PER OPERATION ---")
+    print(f"Config: N={LONG_RUN_SIZE}, Ops={LONG_RUN_OPS}, Snapshot every {SNAPSHOT_EVERY} ops")
+
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Tree', 'Method', 'Repetition', 'Nodes_Allocated', 'Allocs_per_Op', 'Time_per_Op_us', 'Total_Rotations'])
+
+        for rep in range(1, REPETITIONS + 1):
+            base_pool = list(range(LONG_RUN_SIZE * 2))
+            random.Random(rep).shuffle(base_pool)
+            for tree_name, tree_cls in TREES.items():
+                for method in METHODS:
+                    allocs, per_op, us, rotations = run_churn(tree_cls, method, base_pool[:])
+                    writer.writerow([tree_name, method, rep, allocs, per_op, us, rotations])
+                    print(f"    [{tree_name}/{method}] rep={rep}: {per_op:.2f} nodes/op, {us:.2f} us/op, rotations={rotations}")
+
+    print(f"\nPersistent Benchmark Completed. Data saved to {csv_path}")
+
+if __name__ == '__main__':
+    main()
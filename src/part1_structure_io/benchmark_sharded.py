@@ -0,0 +1,75 @@
+import sys
+import os
+import csv
+import time
+import random
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from avl_tree import AVLTree
+from sharded_avl import ShardedAVLTree
+
+# --- CONFIGURATION ---
+LONG_RUN_SIZE = 1000000
+LONG_RUN_OPS = 1000000
+BATCH = 20000
+WORKER_COUNTS = [1, 2, 4, 8]
+REPETITIONS = 3
+MODE = 'optimized'
+
+def churn_batches(pool):
+    """The run_long_running workload (delete the oldest key, insert a fresh one), cut into (deletes, inserts) batches"""
+    for start in range(0, LONG_RUN_OPS, BATCH):
+        deletes, inserts = [], []
+        for k in range(start, min(start + BATCH, LONG_RUN_OPS)):
+            rem = pool[k % LONG_RUN_SIZE]
+            add = pool[(k + LONG_RUN_SIZE) % len(pool)]
+            deletes.append(rem)
+            inserts.append(add)
+            pool[k % LONG_RUN_SIZE] = add
+        yield deletes, inserts
+
+def run_single(pool):
+    """Baseline: one in-process AVLTree applying the same batches"""
+    avl = AVLTree.from_sorted(pool[:LONG_RUN_SIZE], MODE)
+    start = time.perf_counter()
+    for deletes, inserts in churn_batches(pool):
+        for key in deletes: avl.delete(key)
+        for key in inserts: avl.insert(key)
+    return time.perf_counter() - start, 1
+
+def run_sharded(pool, workers):
+    with ShardedAVLTree(pool[:LONG_RUN_SIZE], workers, MODE) as index:
+        start = time.perf_counter()
+        for deletes, inserts in churn_batches(pool):
+            index.delete_many(deletes)
+            index.insert_many(inserts)
+        elapsed = time.perf_counter() - start
+        return elapsed, len(index.shard_sizes)
+
+def main():
+    data_dir = os.path.join(os.path.dirname(__file__), '../../data')
+    if not os.path.exists(data_dir): os.makedirs(data_dir)
+    csv_path = os.path.join(data_dir, 'results_sharded.csv')
+
+    print(f"--- SHARDED INDEX: LONG-RUNNING CHURN THROUGHPUT vs WORKER PROCESSES ---")
+    print(f"Config: N={LONG_RUN_SIZE}, Ops={LONG_RUN_OPS}, Batch={BATCH}, Workers={WORKER_COUNTS}")
+
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Index', 'Workers', 'Repetition', 'Total_Time_s', 'Ops_per_s', 'Final_Shards'])
+
+        for rep in range(1, REPETITIONS + 1):
+            base_pool = list(range(LONG_RUN_SIZE * 2))
+            random.Random(rep).shuffle(base_pool)
+            runs = [('Single', 1, lambda pool: run_single(pool))]
+            runs += [('Sharded', w, lambda pool, w=w: run_sharded(pool, w)) for w in WORKER_COUNTS]
+            for name, workers, run in runs:
+                elapsed, shards = run(base_pool[:])
+                ops = 2 * LONG_RUN_OPS
+                writer.writerow([name, workers, rep, elapsed, ops / elapsed, shards])
+                print(f"    [{name}] workers={workers} rep={rep}: {ops / elapsed:,.0f} ops/s ({elapsed:.2f}s)")
+
+    print(f"\nSharded Benchmark Completed. Data saved to {csv_path}")
+
+if __name__ == '__main__':
+    main()
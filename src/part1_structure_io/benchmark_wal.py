@@ -0,0 +1,93 @@
+import sys
+import os
+import csv
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from avl_tree import AVLTree
+from avl_wal import DurableAVLTree, recover
+
+# --- CONFIGURATION ---
+LONG_RUN_SIZE = 100000
+LONG_RUN_OPS = 1000000  # delete+insert pairs, as in benchmark_io's Long_Running
+CHECKPOINT_EVERY = 500000  # updates between checkpoints
+REPETITIONS = 3
+SEED = 2024
+GROUP_SIZE = 1024
+# (label, group_size, sync_interval seconds; None = fsync only at checkpoints and close)
+CONFIGS = [('In_Memory', None, None),
+           ('No_Sync', GROUP_SIZE, None),
+           ('Sync_1s', GROUP_SIZE, 1.0),
+           ('Sync_100ms', GROUP_SIZE, 0.1),
+           ('Sync_10ms', GROUP_SIZE, 0.01),
+           ('Sync_Every_Frame', GROUP_SIZE, 0.0),
+           ('Group_64_No_Sync', 64, None),
+           ('Per_Op_Write', 1, None)]
+
+def run_churn(label, group_size, sync_interval, rep, base_dir):
+    """Long-running delete+insert churn through the log, then a timed recovery of what it left on disk"""
+    pool = list(range(LONG_RUN_SIZE * 2))
+    random.Random(f"{SEED}:{rep}").shuffle(pool)
+    directory = os.path.join(base_dir, f'{label}-{rep}')
+    if group_size is None: avl = AVLTree()
+    else: avl = DurableAVLTree(directory, group_size=group_size, sync_interval=sync_interval, checkpoint_every=CHECKPOINT_EVERY)
+    for i in range(LONG_RUN_SIZE): avl.insert(pool[i])
+    if group_size is not None: avl.checkpoint()
+
+    start = time.perf_counter()
+    for k in range(LONG_RUN_OPS):
+        rem = pool[k % LONG_RUN_SIZE]
+        add = pool[(k + LONG_RUN_SIZE) % len(pool)]
+        avl.delete(rem)
+        avl.insert(add)
+        pool[k % LONG_RUN_SIZE] = add
+    if group_size is not None: avl.close()
+    elapsed = time.perf_counter() - start
+    ops_per_sec = 2 * LONG_RUN_OPS / elapsed
+    if group_size is None: return ops_per_sec, 0, 0, 0.0, 0
+
+    log_bytes = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory) if name.endswith('.log'))
+    start = time.perf_counter()
+    tree, _, replayed = recover(directory)
+    recovery = time.perf_counter() - start
+    if list(tree) != list(avl): raise RuntimeError(f"{label}: recovered tree differs from the live one")
+    shutil.rmtree(directory)
+    return ops_per_sec, avl.stats['frames'], avl.stats['syncs'], recovery, log_bytes
+
+def main():
+    parser = argparse.ArgumentParser(description='Write-ahead log throughput at different group sizes and sync intervals')
+    parser.add_argument('--dir', default=None, help='directory for the logs (default: a temporary one; fsync cost depends on the disk)')
+    args = parser.parse_args()
+
+    data_dir = os.path.join(os.path.dirname(__file__), '../../data')
+    if not os.path.exists(data_dir): os.makedirs(data_dir)
+    csv_path = os.path.join(data_dir, 'results_wal.csv')
+    base_dir = args.dir or tempfile.mkdtemp(prefix='avl-wal-')
+    os.makedirs(base_dir, exist_ok=True)
+
+    print(f"--- WRITE-AHEAD LOG: THROUGHPUT vs SYNC INTERVAL ---")
+    print(f"Config: N={LONG_RUN_SIZE}, Ops={LONG_RUN_OPS} pairs, checkpoint every {CHECKPOINT_EVERY} updates, logs in {base_dir}")
+
+    try:
+        with open(csv_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Config', 'Group_Size', 'Sync_Interval_s', 'Repetition', 'Ops_Per_Sec',
+                             'Frames', 'Syncs', 'Recovery_Seconds', 'Log_Bytes'])
+            for label, group_size, sync_interval in CONFIGS:
+                for rep in range(1, REPETITIONS + 1):
+                    ops_per_sec, frames, syncs, recovery, log_bytes = run_churn(label, group_size, sync_interval, rep, base_dir)
+                    writer.writerow([label, group_size or '', '' if sync_interval is None else sync_interval, rep,
+                                     ops_per_sec, frames, syncs, recovery, log_bytes])
+                    f.flush()
+                    print(f"    [{label}] rep={rep}: {ops_per_sec:,.0f} ops/s, {syncs} fsyncs, recovery {recovery:.2f}s")
+    finally:
+        if args.dir is None: shutil.rmtree(base_dir, ignore_errors=True)
+
+    print(f"\nWAL Benchmark Completed. Data saved to {csv_path}")
+
+if __name__ == '__main__':
+    main()
@@ -7,8 +7,11 @@ import sys
 from io import StringIO 
 
 CSV_REL_PATH = '../../data/results_structure.csv'
+DRIFT_CSV_REL_PATH = '../../data/results_shape_drift.csv'
 OUT_DIR_REL_PATH = '../../analysis/structure_io'
 ANALYSIS_OUTPUT_FILENAME = 'linear_regression_analysis.txt' 
+BACKEND = 'object'
+CORES_METODOS = {"Standard": "#f03a53", "Optimized": "#0bafee"}
 
 def configurar_ambiente():
     """Define caminhos e cria diretórios de saída se necessário."""
@@ -30,6 +33,14 @@ def carregar_dados(data_path):
         print("Error: CSV file not found. Run the benchmark first.")
         return None
 
+def filtrar_backend(df):
+    """Mantém um único backend (BACKEND, se presente), já que uma execução retomada pode misturar backends no CSV."""
+    if 'Backend' not in df.columns: return df
+    backends = sorted(df['Backend'].unique())
+    backend = BACKEND if BACKEND in backends else backends[0]
+    if len(backends) > 1: print(f"Plotting backend '{backend}' (CSV also has {[b for b in backends if b != backend]})")
+    return df[df['Backend'] == backend]
+
 def definir_estilo():
     """Aplica o tema visual global."""
     sns.set_theme(style="white")
@@ -104,13 +115,12 @@ def plotar_escalabilidade(df, out_dir):
 
     registrar_analise_em_arquivo(out_dir, analise_text)
 
-    cores_personalizadas = { "Standard": "#f03a53", "Optimized": "#0bafee" }
     plt.figure(figsize=(10, 6))
     
     ax = sns.lineplot(
         data=df_scaling, x='Size', y='Total_Rotations', hue='Method', 
         style='Scenario', markers=True, dashes=False, err_style='band',
-        palette=cores_personalizadas, linewidth=2.5
+        palette=CORES_METODOS, linewidth=2.5
     )
     
     plt.xscale('log')
@@ -192,17 +202,43 @@ def plotar_eficiencia(df, out_dir):
     print(f"Saved: {save_path}")
     plt.close()
 
+def plotar_deriva_forma(out_dir):
+    """Gera o gráfico da profundidade média e da altura ao longo da simulação Long_Running."""
+    drift_path = os.path.join(os.path.dirname(__file__), DRIFT_CSV_REL_PATH)
+    if not os.path.exists(drift_path):
+        print("Shape drift CSV not found; skipping drift plot.")
+        return
+    print("Generating Shape Drift Plot...")
+    df = filtrar_backend(pd.read_csv(drift_path))
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+    for ax, metric, label in [(axes[0], 'Avg_Depth', 'Average Depth'), (axes[1], 'Height', 'Height')]:
+        sns.lineplot(data=df, x='Ops', y=metric, hue='Method', palette=CORES_METODOS,
+                     errorbar=('pi', 100), ax=ax, linewidth=1.5)
+        ax.set_xlabel('Delete+Insert Pairs', fontsize=12)
+        ax.set_ylabel(label, fontsize=12)
+        sns.despine(ax=ax, top=True, right=True)
+    axes[0].set_title('Average Depth Drift (band = min-max over reps)', fontsize=12)
+    axes[1].set_title('Height Drift', fontsize=12)
+
+    save_path = os.path.join(out_dir, 'shape_drift.png')
+    plt.savefig(save_path, dpi=600, bbox_inches='tight')
+    print(f"Saved: {save_path}")
+    plt.close()
+
 def main():
     data_path, out_dir = configurar_ambiente()
 
     df = carregar_dados(data_path)
     if df is None:
         return
+    df = filtrar_backend(df)
 
     definir_estilo()
     
     plotar_escalabilidade(df, out_dir) 
     plotar_eficiencia(df, out_dir)
+    plotar_deriva_forma(out_dir)
     
     print("\nAll plots and analysis registered successfully.")
 
@@ -0,0 +1,193 @@
+from avl_tree import AVLTree, Node
+
+
+class _PathNode(Node):
+    """Node tagged with the edit token of the operation that allocated it."""
+    __slots__ = ('edit',)
+
+    def __init__(self, key, value=None, edit=None):
+        super().__init__(key, value)
+        self.edit = edit
+
+
+class PersistentAVLTree(AVLTree):
+    """AVLTree whose insert/delete copy the root-to-leaf path instead of mutating nodes.
+
+    Nodes are never changed once the operation that created them returns, so
+    snapshot() is O(1): it shares the current root. Old versions stay readable
+    and are reclaimed by the garbage collector once no snapshot refers to them.
+    Every operation tags the nodes it allocates with a fresh edit token; only
+    those nodes may be modified in place (including by rotations), everything
+    else is copied first. stats['allocations'] counts the copies.
+
+    Bulk, split/join and set operations run the AVLTree algorithms unchanged:
+    join copies the spine it descends and the pivot, so split and the set
+    operations copy O(log n) nodes per split/join step as well. Because copy()
+    is a snapshot, union/intersection/difference leave both operands intact at
+    no extra cost; the consume_* variants and split only empty their operands,
+    whose snapshots keep every key.
+    """
+
+    def __init__(self, mode='standard', order_stats=False, duplicates='allow'):
+        super().__init__(mode, order_stats, duplicates)
+        self.stats['allocations'] = 0
+        self._edit = object()
+
+    def reset_stats(self):
+        super().reset_stats()
+        self.stats['allocations'] = 0
+
+    def snapshot(self):
+        """Returns an O(1) snapshot sharing every node with this version."""
+        snap = self._empty_like()
+        snap.root = self.root
+        snap._size = self._size
+        return snap
+
+    def copy(self):
+        return self.snapshot()
+
+    def _own(self, node):
+        """Returns node if the current operation allocated it, otherwise a fresh copy of it."""
+        if getattr(node, 'edit', None) is self._edit: return node
+        self.stats['allocations'] += 1
+        new = _PathNode(node.key, node.value, self._edit)
+        new.left = node.left
+        new.right = node.right
+        new.height = node.height
+        new.size = node.size
+        new.count = node.count
+        return new
+
+    def _copy_path(self, path, n):
+        """Replaces path[:n] with fresh copies linked to each other."""
+        for i in range(n):
+            node = path[i]
+            new = self._own(node)
+            if i:
+                if path[i - 1].left is node: path[i - 1].left = new
+                else: path[i - 1].right = new
+            path[i] = new
+
+    def _rotate_right(self, z):
+        z = self._own(z)
+        z.left = self._own(z.left)
+        return super()._rotate_right(z)
+
+    def _rotate_left(self, z):
+        z = self._own(z)
+        z.right = self._own(z.right)
+        return super()._rotate_left(z)
+
+    def insert(self, key, value=None):
+        self._edit = object()
+        super().insert(key, value)
+
+    def put(self, key, value):
+        self._edit = object()
+        super().put(key, value)
+
+    def delete(self, key):
+        """Deletes one occurrence of key by path copying; returns whether it was present."""
+        self._edit = object()
+        return super().delete(key)
+
+    def _insert_node(self, root, key, value, duplicates, new=None):
+        """AVLTree._insert_node with the root-to-leaf path copied before anything on it changes."""
+        path = []
+        node = root
+        while node:
+            path.append(node)
+            if key < node.key: node = node.left
+            elif key == node.key and duplicates != 'allow': break
+            else: node = node.right
+        self.stats['comparisons'] += len(path)
+
+        if node is not None:
+            self.stats['duplicates'] += 1
+            self._matched += 1
+            if duplicates == 'reject': return root
+            self._copy_path(path, len(path))
+            if duplicates == 'replace': path[-1].value = value
+            else: path[-1].count += new.count if new else 1
+            return path[0]
+
+        self._copy_path(path, len(path))
+        if new is None:
+            new = _PathNode(key, value, self._edit)
+            self.stats['allocations'] += 1
+        if self.order_stats:
+            self._shift += len(path)
+            for node in path: node.size += 1
+        if not path: return new
+        if key < path[-1].key: path[-1].left = new
+        else: path[-1].right = new
+        return self._retrace(path, len(path) - 1)
+
+    def _delete_key(self, root, key, copies=1):
+        """AVLTree._delete_key with the path down to the removed node copied first."""
+        path = []
+        node = root
+        while node:
+            path.append(node)
+            if key < node.key: node = node.left
+            elif key > node.key: node = node.right
+            else: break
+        else:
+            self.stats['comparisons'] += len(path)
+            return root
+
+        if node.count > copies:
+            self.stats['comparisons'] += len(path)
+            self._matched += 1
+            self._decrements += 1
+            self._copy_path(path, len(path))
+            path[-1].count -= copies
+            return path[0]
+
+        target = len(path) - 1
+        if node.left and node.right:
+            if self._choose_replacement(node) == 'left':
+                current = node.left
+                while current:
+                    path.append(current)
+                    current = current.right
+            else:
+                current = node.right
+                while current:
+                    path.append(current)
+                    current = current.left
+        self.stats['comparisons'] += len(path)
+        self._matched += 1
+
+        removed = path[-1]
+        self._copy_path(path, len(path) - 1)
+        path.pop()
+        if path and target < len(path):
+            path[target].key = removed.key
+            path[target].value = removed.value
+            path[target].count = removed.count
+        child = removed.left if removed.left else removed.right
+        if self.order_stats:
+            self._shift -= len(path) + self.get_size(child)
+            for node in path: node.size -= 1
+        if not path: return child
+        if path[-1].left is removed: path[-1].left = child
+        else: path[-1].right = child
+        return self._retrace(path, len(path) - 1)
+
+    def insert_many(self, keys):
+        self._edit = object()
+        super().insert_many(keys)
+
+    def delete_many(self, keys):
+        self._edit = object()
+        super().delete_many(keys)
+
+    def put_many(self, items):
+        """put() for each (key, value) pair; AVLTree.put_many updates present keys in place, which snapshots would see."""
+        for key, value in dict(items).items(): self.put(key, value)
+
+    def split(self, key):
+        self._edit = object()
+        return super().split(key)
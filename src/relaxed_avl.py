@@ -0,0 +1,160 @@
+from avl_tree import AVLTree
+
+
+class RelaxedAVLTree(AVLTree):
+    """AVLTree whose insert/put/delete defer rotations to an explicit rebalance(budget) pass.
+
+    While `deferred` is on, an update only refreshes heights along its path and
+    marks the nodes that fell out of AVL balance (and their ancestors) as
+    dirty; no rotation runs on the write path. A node whose imbalance would
+    exceed max_slack is repaired on the spot, which keeps the height
+    logarithmic even for sorted bursts. rebalance(budget) later repairs the
+    dirty nodes bottom-up with at most about `budget` rotations per call, so
+    the work can be spread over idle time.
+
+    Clean nodes always root strict AVL subtrees. Bulk operations (insert_many,
+    delete_many, split, join, set operations, copy) rebalance completely first.
+    """
+
+    def __init__(self, mode='standard', order_stats=False, duplicates='allow', max_slack=4):
+        if max_slack < 2: raise ValueError("max_slack must be at least 2")
+        super().__init__(mode, order_stats, duplicates)
+        self.max_slack = max_slack
+        self.deferred = True
+        self._dirty = set()
+        self._budget = None
+        self._top_level = False
+
+    def _empty_like(self):
+        return type(self)(self.mode, order_stats=self.order_stats, duplicates=self.duplicates, max_slack=self.max_slack)
+
+    def insert(self, key, value=None):
+        self._top_level = self.deferred
+        try:
+            super().insert(key, value)
+        finally:
+            self._top_level = False
+
+    def put(self, key, value):
+        self._top_level = self.deferred
+        try:
+            super().put(key, value)
+        finally:
+            self._top_level = False
+
+    def delete(self, key):
+        self._top_level = self.deferred
+        try:
+            return super().delete(key)
+        finally:
+            self._top_level = False
+
+    def _retrace(self, path, i):
+        """Refreshes heights bottom-up and marks imbalance instead of rotating.
+
+        Only single insert/put/delete calls defer: the subtrees that split/join
+        pass through _insert_node/_delete_key during bulk operations must stay
+        strict AVL, since _join assumes balanced inputs.
+        """
+        if not self._top_level: return super()._retrace(path, i)
+        while i >= 0:
+            node = path[i]
+            old_height = node.height
+            left_height = node.left.height if node.left else 0
+            right_height = node.right.height if node.right else 0
+            balance = left_height - right_height
+            if balance > self.max_slack or balance < -self.max_slack:
+                self._dirty.add(node)
+                node = self._repair(node)
+                self._ipl = None
+                if not i: path[0] = node
+                elif path[i - 1].left is path[i]: path[i - 1].left = node
+                else: path[i - 1].right = node
+            else:
+                node.height = 1 + (left_height if left_height > right_height else right_height)
+                if balance > 1 or balance < -1: self._mark(path, i)
+            if node.height == old_height: break
+            i -= 1
+        return path[0]
+
+    def _mark(self, path, i):
+        """Marks path[i] and its ancestors dirty; an already dirty node has dirty ancestors, so stop there."""
+        dirty = self._dirty
+        while i >= 0 and path[i] not in dirty:
+            dirty.add(path[i])
+            i -= 1
+
+    def _repair(self, node):
+        """Rebalances the dirty nodes of the subtree at node bottom-up and returns its new root.
+
+        Both children are repaired first, so node joins two strict AVL subtrees
+        (O(height difference) rotations). Stops early once the rotation budget is spent.
+        """
+        dirty = self._dirty
+        if node not in dirty: return node
+        if self._budget is not None and self.stats['rotations'] >= self._budget: return node
+        if node.left: node.left = self._repair(node.left)
+        if node.right: node.right = self._repair(node.right)
+        if node.left in dirty or node.right in dirty:
+            node.height = 1 + max(self.get_height(node.left), self.get_height(node.right))
+            return node
+        dirty.discard(node)
+        return self._join(node.left, node, node.right)
+
+    def rebalance(self, budget=None):
+        """Repairs deferred imbalance with at most about `budget` rotations (None = all of it).
+
+        Returns True once the whole tree is a strict AVL tree again.
+        """
+        if self.root not in self._dirty:
+            self._dirty.clear()
+            return True
+        self._budget = None if budget is None else self.stats['rotations'] + budget
+        try:
+            self.root = self._repair(self.root)
+        finally:
+            self._budget = None
+        self._ipl = None
+        self._version += 1
+        if self.root in self._dirty: return False
+        self._dirty.clear()
+        return True
+
+    def needs_rebalance(self):
+        return self.root in self._dirty
+
+    def height_slack(self):
+        """Levels by which the height exceeds the worst case of a strict AVL tree with as many nodes (0 if within it)."""
+        n = self.get_size(self.root) if self.order_stats else len(self)
+        # fewest nodes of an AVL tree of height h: N(h) = N(h-1) + N(h-2) + 1
+        bound, fewest, previous = 0, 0, 0
+        while fewest + previous + 1 <= n:
+            bound, fewest, previous = bound + 1, fewest + previous + 1, fewest
+        return max(0, self.get_height(self.root) - bound)
+
+    def insert_many(self, keys):
+        self.rebalance()
+        super().insert_many(keys)
+
+    def delete_many(self, keys):
+        self.rebalance()
+        super().delete_many(keys)
+
+    def split(self, key):
+        self.rebalance()
+        return super().split(key)
+
+    @classmethod
+    def join(cls, left, pivot, right):
+        for tree in (left, right):
+            if isinstance(tree, RelaxedAVLTree): tree.rebalance()
+        return super().join(left, pivot, right)
+
+    def _set_operation(self, other, operation):
+        for tree in (self, other):
+            if isinstance(tree, RelaxedAVLTree): tree.rebalance()
+        return super()._set_operation(other, operation)
+
+    def copy(self):
+        self.rebalance()
+        return super().copy()
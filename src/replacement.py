@@ -0,0 +1,216 @@
+import random
+from functools import partial
+
+LEFT, RIGHT = 0, 1
+SIDES = ['left', 'right']
+
+
+class ReplacementStrategy:
+    """Decides which neighbour replaces a deleted node that has two children.
+
+    choose(tree, node) returns 'left' (in-order predecessor) or 'right'
+    (successor). Strategies only read the tree through get_height, get_balance
+    and _children, so they work on both backends. attach(tree) shadows
+    tree._choose_replacement on that instance (the pattern of use_finger and
+    Instrumentation); detach(tree) restores the mode's fixed policy.
+    Stateful strategies (alternating, random, adaptive) belong to one tree.
+    """
+
+    name = None
+
+    def choose(self, tree, node):
+        raise NotImplementedError
+
+    def attach(self, tree):
+        tree._choose_replacement = partial(self.choose, tree)
+
+    def detach(self, tree):
+        tree.__dict__.pop('_choose_replacement', None)
+
+
+class Successor(ReplacementStrategy):
+    """Always the successor: the 'standard' mode."""
+
+    name = 'successor'
+
+    def choose(self, tree, node):
+        return 'right'
+
+
+class TallerSide(ReplacementStrategy):
+    """The predecessor when the left subtree is strictly taller: the 'optimized' mode."""
+
+    name = 'taller'
+
+    def choose(self, tree, node):
+        left, right = tree._children(node)
+        return 'left' if tree.get_height(left) > tree.get_height(right) else 'right'
+
+
+class BalanceAware(ReplacementStrategy):
+    """Taller side when node leans; when it is balanced, avoids the child that would have to rotate.
+
+    Removing the predecessor walks the right spine of the left child, so a
+    left child that leans left may rotate; the successor mirrors this.
+    """
+
+    name = 'balance'
+
+    def choose(self, tree, node):
+        balance = tree.get_balance(node)
+        if balance: return 'left' if balance > 0 else 'right'
+        left, right = tree._children(node)
+        left_risk = tree.get_balance(left) > 0
+        right_risk = tree.get_balance(right) < 0
+        return 'left' if right_risk and not left_risk else 'right'
+
+
+class Alternating(ReplacementStrategy):
+    """Successor and predecessor in turn, so neither subtree is drained systematically."""
+
+    name = 'alternating'
+
+    def __init__(self):
+        self._next = RIGHT
+
+    def choose(self, tree, node):
+        side = self._next
+        self._next = 1 - side
+        return SIDES[side]
+
+
+class Randomized(ReplacementStrategy):
+    """A fair coin per deletion (seeded, so runs are reproducible)."""
+
+    name = 'random'
+
+    def __init__(self, seed=0):
+        self._random = random.Random(seed).random
+
+    def choose(self, tree, node):
+        return 'left' if self._random() < 0.5 else 'right'
+
+
+def _after_loss(tree, node, side, new_height):
+    """Returns (rotations, new height of node) once its `side` child shrinks to new_height."""
+    children, height = tree._children, tree.get_height
+    other = children(node)[1 - side]
+    other_height = height(other)
+    if other_height - new_height <= 1: return 0, 1 + max(other_height, new_height)
+    near, far = (height(child) for child in (children(other)[side], children(other)[1 - side]))
+    if near > far: return 2, other_height
+    return 1, other_height + 1 if near == far else other_height
+
+
+def removal_cost(tree, node, side):
+    """Simulates replacing node from side (LEFT = predecessor, RIGHT = successor) without touching the tree.
+
+    Returns (rotations, height drop of node): the rotations the retrace would
+    perform up to and including node, and whether it would continue above it.
+    """
+    children, height = tree._children, tree.get_height
+    spine = []
+    current = children(node)[side]
+    while current:
+        spine.append(current)
+        current = children(current)[1 - side]
+    new_height = height(children(spine.pop())[side])
+    rotations = 0
+    for ancestor in reversed(spine):
+        old_height = height(ancestor)
+        r, new_height = _after_loss(tree, ancestor, 1 - side, new_height)
+        rotations += r
+        if new_height == old_height: return rotations, 0
+    old_height = height(node)
+    r, new_height = _after_loss(tree, node, side, new_height)
+    return rotations + r, old_height - new_height
+
+
+class Lookahead(ReplacementStrategy):
+    """Simulates both replacements and picks the one with fewer rotations, then the smaller height drop.
+
+    Costs one extra walk down each spine (O(log n)) per two-child deletion.
+    Ties go to the taller side.
+    """
+
+    name = 'lookahead'
+
+    def choose(self, tree, node):
+        left, right = removal_cost(tree, node, LEFT), removal_cost(tree, node, RIGHT)
+        if left != right: return 'left' if left < right else 'right'
+        return TallerSide.choose(self, tree, node)
+
+
+class Adaptive(ReplacementStrategy):
+    """Learns online which candidate policy costs the fewest rotations on the current workload.
+
+    Every deletion's rotations are charged to the policy that made its choice,
+    as an exponentially weighted average (weight alpha). The cheapest policy
+    drives the choices, and every `explore`-th choice tries the candidates in
+    turn so their estimates stay fresh. attach() also wraps tree.delete to
+    measure the rotations; switches counts how often the leader changed.
+    """
+
+    name = 'adaptive'
+
+    def __init__(self, candidates=('successor', 'taller', 'balance', 'lookahead'), alpha=0.05, explore=16):
+        self.policies = {name: make_strategy(name) for name in candidates}
+        self.cost = dict.fromkeys(self.policies, 0.0)
+        self.current = candidates[0]
+        self.alpha = alpha
+        self.explore = explore
+        self.switches = 0
+        self._calls = 0
+        self._pending = None
+
+    def choose(self, tree, node):
+        self._calls += 1
+        if self._calls % self.explore: policy = self.current
+        else: policy = list(self.policies)[self._calls // self.explore % len(self.policies)]
+        self._pending = policy
+        return self.policies[policy].choose(tree, node)
+
+    def observe(self, rotations):
+        """Charges the rotations of the deletion that just finished to the policy that chose its replacement."""
+        policy, self._pending = self._pending, None
+        if policy is None: return
+        self.cost[policy] += self.alpha * (rotations - self.cost[policy])
+        best = min(self.cost, key=self.cost.get)
+        if best != self.current:
+            self.current = best
+            self.switches += 1
+
+    def attach(self, tree):
+        super().attach(tree)
+        delete = tree.delete
+        def observed(key):
+            rotations = tree.stats['rotations']
+            result = delete(key)
+            self.observe(tree.stats['rotations'] - rotations)
+            return result
+        tree.delete = observed
+
+    def detach(self, tree):
+        super().detach(tree)
+        tree.__dict__.pop('delete', None)
+
+
+STRATEGIES = {cls.name: cls for cls in [Successor, TallerSide, BalanceAware, Alternating, Randomized, Lookahead, Adaptive]}
+
+
+def make_strategy(strategy):
+    """Returns strategy itself if it is a ReplacementStrategy, else a fresh instance of the named one."""
+    if isinstance(strategy, ReplacementStrategy): return strategy
+    if strategy not in STRATEGIES: raise ValueError(f"unknown replacement strategy {strategy!r}; choose from {sorted(STRATEGIES)}")
+    return STRATEGIES[strategy]()
+
+
+def set_replacement(tree, strategy):
+    """Detaches the tree's current strategy, attaches the new one (a name or instance; None = mode default) and returns it."""
+    previous = tree.__dict__.pop('replacement', None)
+    if previous: previous.detach(tree)
+    if strategy is None: return None
+    strategy = make_strategy(strategy)
+    strategy.attach(tree)
+    tree.replacement = strategy
+    return strategy
@@ -0,0 +1,207 @@
+import multiprocessing
+from bisect import bisect_left, bisect_right
+
+from avl_tree import AVLTree
+
+
+def _copies(tree):
+    """The tree's keys in order with every copy spelled out, so from_sorted() rebuilds 'count' multiplicities."""
+    return [node.key for node in tree._iter_nodes() for _ in range(node.count)]
+
+
+def _serve(conn, keys, mode, kwargs):
+    """Worker process loop: owns one AVLTree and answers (command, args) messages with (result, size)."""
+    tree = AVLTree.from_sorted(keys, mode, **kwargs)
+    while True:
+        command, args = conn.recv()
+        if command == 'insert':
+            for key in args: tree.insert(key)
+            result = None
+        elif command == 'delete':
+            result = 0
+            for key in args: result += tree.delete(key)
+        elif command == 'search':
+            result = tree.search_many(args)
+        elif command == 'range':
+            result = list(tree.irange(*args))
+        elif command == 'split':
+            # keep the lower half, hand the upper half (from the first copy of the median key) back
+            keys = _copies(tree)
+            cut = bisect_left(keys, keys[len(keys) // 2]) if keys else 0
+            if not cut: cut = bisect_right(keys, keys[0])
+            tree = AVLTree.from_sorted(keys[:cut], mode, **kwargs)
+            result = keys[cut:]
+        elif command == 'absorb':
+            tree = AVLTree.from_sorted(_copies(tree) + args, mode, **kwargs)
+            result = None
+        elif command == 'drain':
+            conn.send((_copies(tree), 0))
+            return
+        else:
+            raise ValueError(f"unknown shard command {command!r}")
+        conn.send((result, len(tree)))
+
+
+class _Shard:
+    def __init__(self, keys, mode, kwargs):
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_serve, args=(child, keys, mode, kwargs), daemon=True)
+        self.process.start()
+        child.close()
+        # keys are sorted; under a duplicate policy other than 'allow' each run becomes one node
+        if kwargs.get('duplicates', 'allow') == 'allow': self.size = len(keys)
+        else: self.size = sum(1 for i, key in enumerate(keys) if not i or keys[i - 1] != key)
+
+    def send(self, command, args=None):
+        self.conn.send((command, args))
+
+    def receive(self):
+        result, self.size = self.conn.recv()
+        return result
+
+    def call(self, command, args=None):
+        self.send(command, args)
+        return self.receive()
+
+
+class ShardedAVLTree:
+    """Range-partitioned index: the key space is cut into contiguous ranges, one AVLTree per worker process.
+
+    Shard i holds the keys in [bounds[i], bounds[i+1]). Single operations go to
+    the owning shard; batched ones are grouped per shard and sent to all shards
+    before any reply is read, so the shards work in parallel. Ordered scans just
+    concatenate the per-shard results, since the ranges never overlap.
+
+    When a shard grows past rebalance_factor times the mean shard size it is
+    split at its median into a new worker, and the two smallest neighbouring
+    shards are merged so the number of processes stays at `workers`. Keys move
+    between shards with every copy spelled out, so 'count' multiplicities
+    survive; values are not carried.
+    """
+
+    min_split_size = 1024
+
+    def __init__(self, keys=(), workers=4, mode='standard', rebalance_factor=2.0, **kwargs):
+        """keys seed the partition: the initial bounds cut them into `workers` equal ranges.
+
+        Extra keyword arguments are passed to every shard's AVLTree.
+        """
+        if workers < 1: raise ValueError("workers must be at least 1")
+        keys = sorted(keys)
+        self.mode = mode
+        self.workers = workers
+        self.rebalance_factor = rebalance_factor
+        self.stats = {'splits': 0, 'merges': 0}
+        self._kwargs = kwargs
+        cuts = [0]
+        for i in range(1, workers):
+            cut = bisect_left(keys, keys[i * len(keys) // workers]) if keys else 0
+            if cut > cuts[-1]: cuts.append(cut)
+        cuts.append(len(keys))
+        self._bounds = [keys[cut] for cut in cuts[1:-1]]
+        self._shards = [_Shard(keys[lo:hi], mode, kwargs) for lo, hi in zip(cuts, cuts[1:])]
+
+    def close(self):
+        for shard in self._shards:
+            shard.send('drain')
+            shard.receive()
+            shard.process.join()
+        self._shards = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _route(self, key):
+        return bisect_right(self._bounds, key)
+
+    def _group(self, keys):
+        """Returns {shard index: [positions in keys]}."""
+        groups = {}
+        for i, key in enumerate(keys):
+            groups.setdefault(bisect_right(self._bounds, key), []).append(i)
+        return groups
+
+    def _scatter(self, command, keys):
+        """Sends each shard its share of keys, then collects {shard index: (positions, result)}."""
+        groups = self._group(keys)
+        for s, positions in groups.items():
+            self._shards[s].send(command, [keys[i] for i in positions])
+        return {s: (positions, self._shards[s].receive()) for s, positions in groups.items()}
+
+    def __len__(self):
+        return sum(shard.size for shard in self._shards)
+
+    @property
+    def shard_sizes(self):
+        return [shard.size for shard in self._shards]
+
+    def insert(self, key):
+        self._shards[self._route(key)].call('insert', [key])
+        self._maybe_rebalance()
+
+    def delete(self, key):
+        """Deletes one occurrence of key; returns whether it was present."""
+        return bool(self._shards[self._route(key)].call('delete', [key]))
+
+    def search(self, key):
+        return self._shards[self._route(key)].call('search', [key])[0]
+
+    def __contains__(self, key):
+        return self.search(key)
+
+    def insert_many(self, keys):
+        keys = list(keys)
+        self._scatter('insert', keys)
+        self._maybe_rebalance()
+
+    def delete_many(self, keys):
+        """Deletes one occurrence of each key; returns how many were present."""
+        keys = list(keys)
+        return sum(result for _, result in self._scatter('delete', keys).values())
+
+    def search_many(self, keys):
+        """Returns a list of booleans aligned with keys."""
+        keys = list(keys)
+        found = [False] * len(keys)
+        for positions, result in self._scatter('search', keys).values():
+            for i, hit in zip(positions, result): found[i] = hit
+        return found
+
+    def irange(self, lo=None, hi=None):
+        """Returns the keys in [lo, hi) in order, scanning the overlapping shards in parallel."""
+        first = 0 if lo is None else self._route(lo)
+        last = len(self._shards) - 1 if hi is None else self._route(hi)
+        shards = self._shards[first:last + 1]
+        for shard in shards: shard.send('range', (lo, hi))
+        result = []
+        for shard in shards: result.extend(shard.receive())
+        return result
+
+    def __iter__(self):
+        return iter(self.irange())
+
+    def _maybe_rebalance(self):
+        if self.rebalance_factor is None: return
+        largest = max(self.shard_sizes)
+        if largest >= self.min_split_size and largest > self.rebalance_factor * len(self) / self.workers: self.rebalance()
+
+    def rebalance(self):
+        """Splits the largest shard at its median, then merges the smallest adjacent pair if that exceeded `workers`."""
+        s = max(range(len(self._shards)), key=lambda i: self._shards[i].size)
+        upper = self._shards[s].call('split')
+        if not upper: return
+        self._bounds.insert(s, upper[0])
+        self._shards.insert(s + 1, _Shard(upper, self.mode, self._kwargs))
+        self.stats['splits'] += 1
+        if len(self._shards) > self.workers:
+            i = min(range(len(self._shards) - 1), key=lambda i: self._shards[i].size + self._shards[i + 1].size)
+            right = self._shards.pop(i + 1)
+            right.send('drain')
+            keys = right.receive()
+            right.process.join()
+            del self._bounds[i]
+            self._shards[i].call('absorb', keys)
+            self.stats['merges'] += 1
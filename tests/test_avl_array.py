@@ -0,0 +1,38 @@
+import sys
+import os
+import random
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from avl_array import BACKENDS
+
+
+def test_delete_reports_presence_on_every_backend():
+    rng = random.Random(2024)
+    keys = rng.sample(range(1000), 300)
+    trees = [tree_cls('optimized') for tree_cls in BACKENDS.values()]
+    for tree in trees:
+        for key in keys: tree.insert(key)
+    for key in [rng.randrange(1000) for _ in range(600)]:
+        results = [tree.delete(key) for tree in trees]
+        assert results[0] in (True, False)
+        assert results == [results[0]] * len(trees)
+    assert list(trees[0]) == list(trees[1])
+
+
+def test_delete_on_empty_tree_returns_false():
+    for tree_cls in BACKENDS.values():
+        assert tree_cls().delete(1) is False
+
+
+def test_object_footprint_matches_measured_node_memory():
+    keys = random.Random(2024).sample(range(10 ** 7), 20000)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tree = BACKENDS['object']()
+        for key in keys: tree.insert(key)
+        measured = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    assert abs(tree.get_memory_footprint() - measured) < 0.05 * measured
@@ -0,0 +1,111 @@
+import sys
+import os
+import random
+from collections import Counter
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from avl_tree import AVLTree
+
+
+def counts(tree):
+    return {key: tree.count(key) for key in tree}
+
+
+def test_count_mode_delete_many_removes_one_copy_per_listed_key():
+    tree = AVLTree(duplicates='count')
+    for key in [5, 5, 6, 6, 7]: tree.insert(key)
+    tree.delete_many([5])
+    assert counts(tree) == {5: 1, 6: 2, 7: 1}
+    tree.delete_many([5, 6])
+    assert counts(tree) == {6: 1, 7: 1}
+    tree.delete_many([6, 6, 7])
+    assert counts(tree) == {}
+    assert len(tree) == 0
+
+
+def test_count_mode_insert_many_adds_one_copy_per_listed_key():
+    tree = AVLTree(duplicates='count')
+    tree.insert(5)
+    tree.insert_many([5, 5, 6])
+    assert counts(tree) == {5: 3, 6: 1}
+    assert tree.total() == 4
+    tree.insert(6)
+    assert tree.total() == 5
+
+
+def test_count_mode_batches_match_single_operations():
+    for seed in range(100):
+        rng = random.Random(seed)
+        batched, single = AVLTree(duplicates='count'), AVLTree(duplicates='count', order_stats=True)
+        for _ in range(4):
+            keys = [rng.randrange(40) for _ in range(rng.randrange(60))]
+            batched.insert_many(keys)
+            for key in keys: single.insert(key)
+            keys = [rng.randrange(40) for _ in range(rng.randrange(60))]
+            batched.delete_many(keys)
+            for key in keys: single.delete(key)
+            assert counts(batched) == counts(single)
+            assert len(batched) == len(single) == len(list(single))
+
+
+def test_count_mode_set_operations_use_multiplicities():
+    a, b = [1, 1, 1, 2, 3], [1, 2, 2, 4]
+    for operation, expected in [('union', Counter(a) + Counter(b)), ('difference', Counter(a) - Counter(b)),
+                                ('intersection', Counter(a) & Counter(b))]:
+        left, right = AVLTree(duplicates='count'), AVLTree(duplicates='count')
+        for key in a: left.insert(key)
+        for key in b: right.insert(key)
+        result = getattr(left, operation)(right)
+        assert counts(result) == dict(expected)
+        assert len(result) == len(expected)
+        assert result.total() == sum(expected.values())
+
+
+def test_set_operations_leave_operands_intact():
+    a, b = [1, 1, 1, 2, 3], [1, 2, 2, 4]
+    for duplicates in ['allow', 'count']:
+        for operation in ['union', 'intersection', 'difference']:
+            left, right = AVLTree(duplicates=duplicates), AVLTree(duplicates=duplicates)
+            for key in a: left.insert(key)
+            for key in b: right.insert(key)
+            expected = getattr(left, operation)(right)
+            assert list(left) == (a if duplicates == 'allow' else [1, 2, 3]) and len(left) == len(list(left))
+            assert list(right) == (b if duplicates == 'allow' else [1, 2, 4]) and len(right) == len(list(right))
+            consumed = getattr(left, 'consume_' + operation)(right)
+            assert list(consumed) == list(expected) and counts(consumed) == counts(expected)
+            assert not left and not right
+
+
+def test_join_after_split_keeps_size():
+    for seed in range(50):
+        rng = random.Random(seed)
+        tree = AVLTree()
+        for _ in range(60): tree.insert(rng.randrange(30))
+        pivot = rng.randrange(30)
+        lower, _, upper = tree.split(pivot)
+        joined = AVLTree.join(lower, pivot, upper)
+        assert len(joined) == len(list(joined))
+
+
+def test_trees_compare_and_hash_by_identity():
+    for a, b in [(AVLTree(), AVLTree()), (AVLTree(), AVLTree(duplicates='count'))]:
+        assert a != b and not a == b and a == a
+        assert len({a, b}) == 2
+        a.insert(1)
+        b.insert(1)
+        b.insert(1)
+        assert a != b and len({a, b}) == 2
+        assert {a: 1}[a] == 1
+    assert dict(a.items()) == dict(AVLTree.from_sorted([1]).items())
+
+
+def test_count_mode_len_matches_iteration():
+    tree = AVLTree(duplicates='count')
+    for key in [3, 3, 3, 1, 2, 2]: tree.insert(key)
+    assert len(tree) == len(list(tree)) == len(tree.items()) == 3
+    assert tree.total() == 6
+    tree.delete(3)
+    assert len(tree) == 3 and tree.count(3) == 2
+    tree.delete(1)
+    assert len(tree) == len(list(tree)) == 2
+    assert dict(tree) == {2: None, 3: None}
@@ -0,0 +1,33 @@
+import sys
+import os
+import csv
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from parallel_runner import run_cells
+
+
+def square(cell):
+    return list(cell) + [cell[1] ** 2], [[cell[1]]]
+
+
+def rows(path):
+    with open(path, newline='') as f:
+        return list(csv.reader(f))
+
+
+def test_resume_rewrites_files_with_other_columns(tmp_path):
+    csv_path, samples_path = str(tmp_path / 'results.csv'), str(tmp_path / 'samples.csv')
+    cells = [('object', n) for n in range(4)]
+    header, samples_header = ['Backend', 'N', 'Square'], ['Backend', 'N', 'Sample']
+    with open(csv_path, 'w', newline='') as f: csv.writer(f).writerows([['N', 'Square'], ['0', '0'], ['1', '1']])
+    assert run_cells(square, cells, csv_path, header, workers=1, resume=True,
+                     samples_path=samples_path, samples_header=samples_header) == 4
+    assert rows(csv_path)[0] == header and all(len(row) == 3 for row in rows(csv_path))
+    assert len(rows(samples_path)) == 5
+
+    assert run_cells(square, cells, csv_path, header, workers=1, resume=True,
+                     samples_path=samples_path, samples_header=samples_header) == 0
+    with open(samples_path, 'w', newline='') as f: csv.writer(f).writerow(['N', 'Sample'])
+    assert run_cells(square, cells, csv_path, header, workers=1, resume=True,
+                     samples_path=samples_path, samples_header=samples_header) == 4
+    assert len(rows(csv_path)) == 5 and rows(samples_path)[0] == samples_header and len(rows(samples_path)) == 5
@@ -0,0 +1,60 @@
+import sys
+import os
+import random
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from avl_tree import AVLTree
+from persistent_avl import PersistentAVLTree
+
+
+def contents(tree):
+    return [(key, tree.count(key)) for key in sorted(set(tree))]
+
+
+def test_bulk_and_set_operations_match_avltree_and_keep_snapshots():
+    for duplicates in ['reject', 'count']:
+        for seed in range(30):
+            rng = random.Random(seed)
+            tree, mirror = PersistentAVLTree(duplicates=duplicates), AVLTree(duplicates=duplicates)
+            snapshots = []
+            for step in range(30):
+                keys = [rng.randrange(200) for _ in range(20)]
+                operation = step % 5
+                if operation == 0:
+                    tree.insert_many(keys)
+                    mirror.insert_many(keys)
+                elif operation == 1:
+                    tree.delete_many(keys)
+                    mirror.delete_many(keys)
+                elif operation == 2:
+                    tree.put_many((key, step) for key in keys)
+                    mirror.put_many((key, step) for key in keys)
+                else:
+                    other, other_mirror = PersistentAVLTree(duplicates=duplicates), AVLTree(duplicates=duplicates)
+                    for key in keys:
+                        other.insert(key)
+                        other_mirror.insert(key)
+                    kept = other.snapshot()
+                    name = 'union' if operation == 3 else rng.choice(['difference', 'intersection'])
+                    tree = getattr(tree, name)(other)
+                    mirror = getattr(mirror, name)(other_mirror)
+                    assert contents(kept) == contents(AVLTree.from_sorted(keys, duplicates=duplicates))
+                    assert contents(other) == contents(kept)
+                assert contents(tree) == contents(mirror)
+                assert len(tree) == len(mirror)
+                snapshots.append((tree.snapshot(), contents(tree), list(tree.items())))
+            for snapshot, expected, items in snapshots:
+                assert contents(snapshot) == expected
+                assert list(snapshot.items()) == items
+
+
+def test_split_leaves_snapshot_intact():
+    tree = PersistentAVLTree()
+    for key in range(100): tree.insert(key)
+    snapshot = tree.snapshot()
+    lower, found, upper = tree.split(40)
+    assert found
+    assert list(lower) == list(range(40)) and list(upper) == list(range(41, 100))
+    assert list(snapshot) == list(range(100))
+    assert list(PersistentAVLTree.join(lower, 40, upper)) == list(range(100))
+    assert list(snapshot) == list(range(100))
@@ -0,0 +1,40 @@
+import sys
+import os
+import random
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from relaxed_avl import RelaxedAVLTree
+
+
+def strict_height(node):
+    """Height of a strict AVL subtree with correct stored heights, or -1."""
+    if not node: return 0
+    left, right = strict_height(node.left), strict_height(node.right)
+    if left < 0 or right < 0 or abs(left - right) > 1 or node.height != 1 + max(left, right): return -1
+    return 1 + max(left, right)
+
+
+def test_delete_many_after_rebalance_stays_avl():
+    for seed in range(200):
+        rng = random.Random(seed)
+        tree = RelaxedAVLTree()
+        keys = rng.sample(range(10000), 300)
+        for key in keys: tree.insert(key)
+        assert tree.rebalance()
+        removed = rng.sample(keys, 40)
+        tree.delete_many(removed)
+        assert tree.rebalance()
+        assert strict_height(tree.root) >= 0, seed
+        assert list(tree) == sorted(set(keys) - set(removed))
+
+
+def test_insert_many_during_deferred_burst_stays_avl():
+    for seed in range(50):
+        rng = random.Random(seed)
+        tree = RelaxedAVLTree()
+        for key in range(200): tree.insert(key)
+        batch = rng.sample(range(200, 2000), 100)
+        tree.insert_many(batch)
+        for key in rng.sample(range(200), 50): tree.delete(key)
+        assert tree.rebalance()
+        assert strict_height(tree.root) >= 0, seed
@@ -0,0 +1,21 @@
+import sys
+import os
+import random
+from collections import Counter
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from sharded_avl import ShardedAVLTree
+
+
+def test_count_mode_multiplicities_survive_shard_rebalancing():
+    rng = random.Random(1)
+    keys = [rng.randrange(1000) for _ in range(2000)]
+    expected = Counter(keys)
+    with ShardedAVLTree(keys[:300], workers=3, duplicates='count') as tree:
+        assert len(tree) == len(Counter(keys[:300]))
+        tree.insert_many(keys[300:])
+        for _ in range(4): tree.rebalance()
+        assert tree.stats['splits'] and tree.stats['merges']
+        assert len(tree) == len(expected)
+        assert tree.delete_many(expected.elements()) == len(keys)
+        assert len(tree) == 0